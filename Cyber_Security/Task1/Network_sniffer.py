@@ -3,80 +3,113 @@
 # Works on Windows (Layer 3 sniffing)
 # ========================================
 
-from scapy.all import sniff, # ========================================
-# Basic Network Sniffer using Scapy
-# Works on Windows (Layer 3 sniffing)
-# ========================================
+import argparse
+import sys
+from functools import partial
 
-from scapy.all import sniff, IP, TCP, UDP, Raw
+from scapy.all import sniff
 
-def packet_callback(packet):
-    print("\n=== New Packet Captured ===")
+from bpf import PROTOCOLS, FilterError, combine
+from capture import AsyncWriter, CaptureEngine, open_source
+from dissect import dissect_batch, format_packet
+from flows import FlowMonitor, FlowTable, aggregate_batch
+from recorder import CaptureRecorder
 
-    # IP Layer
-    if packet.haslayer(IP):
-        ip = packet[IP]
-        print(f"[IP] Src: {ip.src} -> Dst: {ip.dst}")
-        print(f"    Protocol: {ip.proto}, TTL: {ip.ttl}")
 
-    # TCP Layer
-    if packet.haslayer(TCP):
-        tcp = packet[TCP]
-        print(f"[TCP] Src Port: {tcp.sport} -> Dst Port: {tcp.dport}")
+def packet_callback(packet, preview=None):
+    print(format_packet(packet, preview))
 
-    # UDP Layer
-    elif packet.haslayer(UDP):
-        udp = packet[UDP]
-        print(f"[UDP] Src Port: {udp.sport} -> Dst Port: {udp.dport}")
 
-    # Payload (application data inside packet)
-    if packet.haslayer(Raw):
-        payload = packet[Raw].load
-        try:
-            text = payload.decode(errors="ignore")
-            print(f"[Payload] {text}")
-        except Exception:
-            print(f"[Payload - Raw Bytes] {payload}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Packet sniffer")
+    parser.add_argument("-i", "--iface", help="interface to capture on (default: all / scapy's default)")
+    parser.add_argument("-r", "--read", metavar="PCAP", help="replay a pcap file instead of capturing live")
+    parser.add_argument("--rate", type=float, help="replay speed in packets/sec (default: as fast as possible)")
+    parser.add_argument("--classic", action="store_true",
+                        help="old single-threaded sniff(prn=...) loop instead of the capture engine")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="dissection processes (default: CPU count; 0 = in the capture process)")
+    parser.add_argument("--scapy-only", action="store_true",
+                        help="dissect every packet with scapy (no struct fast path)")
+    parser.add_argument("-f", "--filter", metavar="EXPR",
+                        help="BPF filter, applied in the kernel (e.g. 'tcp port 443'; needs libpcap "
+                             "unless it only names protocols)")
+    parser.add_argument("-p", "--proto", action="append", choices=PROTOCOLS, default=[],
+                        help="only capture these protocols (repeatable; ANDed with --filter)")
+    parser.add_argument("-s", "--snaplen", type=int, help="keep at most this many bytes of each frame")
+    parser.add_argument("--payload-preview", type=int, metavar="BYTES",
+                        help="print at most this many payload bytes per packet (0 = no payloads)")
+    parser.add_argument("--flows", action="store_true",
+                        help="aggregate into 5-tuple flows and print periodic reports instead of every packet")
+    parser.add_argument("--flow-interval", type=float, default=10, help="seconds between flow reports")
+    parser.add_argument("--idle-timeout", type=float, default=15, help="export a flow after this many idle seconds")
+    parser.add_argument("--active-timeout", type=float, default=120,
+                        help="export (and restart) flows open this long")
+    parser.add_argument("--max-flows", type=int, default=65536, help="flow table size; least recently seen is evicted")
+    parser.add_argument("--top", type=int, default=10, help="top talkers per report")
+    parser.add_argument("--max-listed", type=int, default=1000,
+                        help="evicted flows kept for the next report; the rest are only counted")
+    parser.add_argument("-w", "--write", metavar="DIR",
+                        help="also record everything captured to rotating pcap files in DIR")
+    parser.add_argument("--rotate-size", type=float, default=100, metavar="MB", help="start a new pcap file at this size")
+    parser.add_argument("--rotate-seconds", type=float, default=3600,
+                        help="start a new pcap file after this many seconds of capture (0 = never)")
+    parser.add_argument("--keep", type=int, help="only keep the newest N pcap files (default: all)")
+    parser.add_argument("--summary", choices=("parquet", "arrow"),
+                        help="write a per-packet summary file next to each pcap (needs pyarrow)")
+    parser.add_argument("--batch", type=int, default=256, help="frames per batch handed to a worker")
+    parser.add_argument("--queue", type=int, default=64, help="batches buffered before frames are dropped")
+    return parser.parse_args()
+
 
 # ========================================
 # Run the Sniffer
 # ========================================
 if __name__ == "__main__":
-    print("🚀 Starting Packet Sniffer... Press Ctrl+C to stop.")
-    sniff(prn=packet_callback, store=False)  # store=False prevents memory bloat
- Raw
-
-def packet_callback(packet):
-    print("\n=== New Packet Captured ===")
+    args = parse_args()
+    expression = combine(args.filter, args.proto)
 
-    # IP Layer
-    if packet.haslayer(IP):
-        ip = packet[IP]
-        print(f"[IP] Src: {ip.src} -> Dst: {ip.dst}")
-        print(f"    Protocol: {ip.proto}, TTL: {ip.ttl}")
+    if args.classic:
+        print("🚀 Starting Packet Sniffer... Press Ctrl+C to stop.")
+        sniff(prn=partial(packet_callback, preview=args.payload_preview), store=False,  # store=False prevents memory bloat
+              iface=args.iface, offline=args.read, filter=expression)
+        sys.exit()
 
-    # TCP Layer
-    if packet.haslayer(TCP):
-        tcp = packet[TCP]
-        print(f"[TCP] Src Port: {tcp.sport} -> Dst Port: {tcp.dport}")
+    try:
+        source = open_source(args.iface, args.read, args.rate, expression, args.snaplen)
+    except FilterError as e:
+        sys.exit(f"❌ {e}")
 
-    # UDP Layer
-    elif packet.haslayer(UDP):
-        udp = packet[UDP]
-        print(f"[UDP] Src Port: {udp.sport} -> Dst Port: {udp.dport}")
-
-    # Payload (application data inside packet)
-    if packet.haslayer(Raw):
-        payload = packet[Raw].load
+    recorder = None
+    if args.write:
         try:
-            text = payload.decode(errors="ignore")
-            print(f"[Payload] {text}")
-        except Exception:
-            print(f"[Payload - Raw Bytes] {payload}")
+            recorder = CaptureRecorder(args.write, max_bytes=int(args.rotate_size * (1 << 20)),
+                                       max_seconds=args.rotate_seconds, keep=args.keep, summary=args.summary)
+        except ImportError as e:
+            sys.exit(f"❌ {e}")
 
-# ========================================
-# Run the Sniffer
-# ========================================
-if __name__ == "__main__":
-    print("🚀 Starting Packet Sniffer... Press Ctrl+C to stop.")
-    sniff(prn=packet_callback, store=False)  # store=False prevents memory bloat
+    writer = AsyncWriter()
+    if args.flows:
+        table = FlowTable(args.max_flows, args.idle_timeout, args.active_timeout)
+        process, consume = aggregate_batch, FlowMonitor(writer, table, args.flow_interval, args.top, args.max_listed)
+    else:
+        process, consume = partial(dissect_batch, fast=not args.scapy_only, preview=args.payload_preview), writer
+
+    engine = CaptureEngine(
+        source,
+        process=process,
+        consume=consume,
+        workers=args.workers,
+        batch_size=args.batch,
+        queue_batches=args.queue,
+        lossless=bool(args.read and not args.rate),  # an unpaced replay can wait; live traffic can't
+        record=recorder
+    )
+    print("🚀 Starting Packet Sniffer... Press Ctrl+C to stop.", file=sys.stderr)
+    stats = engine.run()
+    if args.flows:
+        consume.close()
+    writer.close()
+    print(f"\n📊 {stats}", file=sys.stderr)
+    if recorder:
+        print(f"💾 {recorder.close()} -> {args.write}", file=sys.stderr)
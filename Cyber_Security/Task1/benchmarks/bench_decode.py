@@ -0,0 +1,72 @@
+# ========================================
+# Per-packet cost: full scapy dissection vs the struct fast path
+# Also checks the two print exactly the same thing, on the replayed
+# traffic plus a set of awkward frames (VLAN, IP options, padding,
+# fragments, IPv6 extension headers, ICMP, truncated headers, ...).
+# Usage: python bench_decode.py [packets] [pcap]
+# ========================================
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from scapy.all import (ICMP, DNS, DNSQR, Dot1Q, Ether, IP, IPv6, IPv6ExtHdrHopByHop, NTP, RawPcapReader, TCP,
+                       UDP, Raw, fragment)
+
+from decoder import decode
+from dissect import dissect_frame
+from make_pcap import make_pcap
+
+ETH = Ether(src="02:00:00:00:00:01", dst="02:00:00:00:00:02")
+
+
+def awkward_frames():
+    ip = IP(src="10.0.0.1", dst="10.0.0.2")
+    frames = [
+        ETH / Dot1Q(vlan=7) / ip / TCP(sport=1234, dport=8080) / Raw(b"vlan tagged"),
+        ETH / IP(src="10.0.0.1", dst="10.0.0.2", options=b"\x01\x01\x01\x00") / UDP(sport=5000, dport=6000) / Raw(b"opts"),
+        ETH / ip / TCP(sport=1, dport=2, options=[("MSS", 1460), ("NOP", None), ("WScale", 7)]) / Raw(b"tcp opts"),
+        ETH / ip / TCP(sport=1, dport=2),  # no payload, padded to 60 bytes below
+        ETH / ip / UDP(sport=1, dport=2) / Raw(b"\xff\xfe\x00binary\x80"),
+        ETH / ip / UDP(sport=1, dport=53) / DNS(qd=DNSQR(qname="example.com")),
+        ETH / ip / UDP(sport=123, dport=123) / NTP(),
+        ETH / ip / ICMP() / Raw(b"ping"),
+        ETH / IPv6() / IPv6ExtHdrHopByHop() / TCP(sport=1, dport=2) / Raw(b"ext hdr"),
+        ETH / IPv6() / UDP(sport=1, dport=2) / Raw(b"v6 udp"),
+        IP(src="10.0.0.9", dst="10.0.0.8") / TCP(sport=9, dport=10) / Raw(b"raw ip linktype"),
+    ]
+    frames += fragment(ETH / ip / UDP(sport=1, dport=2) / Raw(b"x" * 3000), fragsize=1000)
+    raw = [(bytes(frame), 228 if isinstance(frame, IP) else 1) for frame in frames]
+    raw[3] = (raw[3][0] + b"\x00" * (60 - len(raw[3][0])), 1)
+    raw += [(raw[0][0][:20], 1), (raw[1][0][:40], 1), (b"", 1)]  # truncated
+    return raw
+
+
+if __name__ == "__main__":
+    packets = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    pcap = sys.argv[2] if len(sys.argv) > 2 else make_pcap(os.path.join(tempfile.mkdtemp(), "decode.pcap"), packets)
+    with RawPcapReader(pcap) as reader:
+        linktype = reader.linktype
+        frames = [(frame, linktype) for frame, _ in reader]
+
+    mismatches = [frame for frame, lt in frames + awkward_frames()
+                  if dissect_frame(frame, lt, fast=True) != dissect_frame(frame, lt, fast=False)]
+    fast_share = sum(decode(frame, lt) is not None for frame, lt in frames) / len(frames)
+    print(f"📦 {len(frames)} packets, {fast_share:.1%} on the fast path, "
+          f"{len(mismatches)} output mismatches vs scapy\n")
+
+    for label, fast in (("scapy dissection", False), ("struct fast path", True)):
+        start = time.perf_counter()
+        for frame, lt in frames:
+            dissect_frame(frame, lt, fast)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<20} {elapsed / len(frames) * 1e6:8.2f} µs/packet   {len(frames) / elapsed:9.0f} pkt/s")
+
+    start = time.perf_counter()
+    for frame, lt in frames:
+        decode(frame, lt)
+    elapsed = time.perf_counter() - start
+    print(f"{'decode() alone':<20} {elapsed / len(frames) * 1e6:8.2f} µs/packet")
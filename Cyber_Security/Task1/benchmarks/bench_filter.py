@@ -0,0 +1,98 @@
+# ========================================
+# Capture-process CPU per 100k packets, with and without filtering
+# A sender process replays the pcap onto the loopback interface and the
+# engine captures it live through AF_PACKET, so BPF filters run in the
+# kernel (Linux, needs root). The engine dissects inline (workers=0), so
+# all of the sniffer's Python work shows up in this process's CPU time.
+# Output goes to /dev/null. Without AF_PACKET/root, the pcap is replayed
+# straight from the file and the filter runs in the reader thread instead.
+# Usage: sudo python bench_filter.py [packets] [rate] [pcap]
+# ========================================
+
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from scapy.all import RawPcapReader
+
+from capture import AfPacketSource, AsyncWriter, CaptureEngine, PcapReplaySource
+from dissect import dissect_batch
+from make_pcap import make_pcap
+
+# label, filter expression, snaplen, payload preview
+CASES = (
+    ("no filter", None, None, None),
+    ("-p tcp", "tcp", None, None),
+    ("-p tcp -s 96 --payload-preview 32", "tcp", 96, 32),
+    ("-p arp", "arp", None, None),
+)
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def send(pcap, rate):
+    """Sender process: writes every frame of the pcap to lo at `rate` packets/sec."""
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+    sock.bind(("lo", 0))
+    start = time.perf_counter()
+    with RawPcapReader(pcap) as reader:
+        for n, (frame, _) in enumerate(reader):
+            if n % 64 == 0:
+                ahead = n / rate - (time.perf_counter() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+            sock.send(frame)
+
+
+def stop_when_quiet(engine, sender):
+    """Stops the engine once the sender is done and nothing has arrived for a while."""
+    sender.join()
+    seen = -1
+    while seen != engine.counters["captured"]:
+        seen = engine.counters["captured"]
+        time.sleep(1)
+    engine.stop()
+
+
+def run(source, preview, sender=None):
+    with open(os.devnull, "w") as devnull:
+        writer = AsyncWriter(devnull)
+        engine = CaptureEngine(source, partial(dissect_batch, preview=preview), writer, workers=0,
+                               lossless=sender is None)
+        before = cpu_seconds()
+        if sender is not None:
+            sender.start()
+            threading.Thread(target=stop_when_quiet, args=(engine, sender), daemon=True).start()
+        stats = engine.run()
+        writer.close()
+        return cpu_seconds() - before, stats
+
+
+if __name__ == "__main__":
+    packets = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    pcap = sys.argv[3] if len(sys.argv) > 3 else make_pcap(os.path.join(tempfile.mkdtemp(), "filter.pcap"), packets)
+    live = hasattr(socket, "AF_PACKET") and os.geteuid() == 0
+    how = f"replayed onto lo at {rate:.0f} pkt/s, kernel filter" if live else "read from the file, userland filter"
+    print(f"📦 {packets} packets, {how}\n")
+
+    for label, expression, snaplen, preview in CASES:
+        if live:
+            source = AfPacketSource("lo", snaplen, expression=expression)
+            cpu, stats = run(source, preview, multiprocessing.Process(target=send, args=(pcap, rate)))
+        else:
+            cpu, stats = run(PcapReplaySource(pcap, None, expression, snaplen), preview)
+        lost = stats["dropped"] + stats["kernel_dropped"]
+        print(f"{label:<36} {cpu / packets * 1e5:6.2f} CPU s / 100k packets   "
+              f"{stats['captured']:7d} reached Python   {lost} dropped")
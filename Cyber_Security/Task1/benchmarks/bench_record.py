@@ -0,0 +1,86 @@
+# ========================================
+# Recording cost on a replayed pcap
+# 1. engine throughput in flow mode, without and with -w (pcap only,
+#    + Parquet summaries, + Arrow summaries): packets/sec and disk used
+# 2. the recorder alone, fed the pcap over and over: write rate and
+#    resident memory after each pass (should stay flat while files rotate)
+# Usage: python bench_record.py [packets] [passes] [pcap]
+# ========================================
+
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from capture import AsyncWriter, CaptureEngine, PcapReplaySource
+from flows import FlowMonitor, aggregate_batch
+from make_pcap import make_pcap
+from recorder import CaptureRecorder
+
+MODES = (("no recording", None), ("pcap", "pcap"), ("pcap + parquet", "parquet"), ("pcap + arrow", "arrow"))
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1 << 20)
+    except OSError:  # not Linux: peak instead of current
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def disk_mb(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory)) / (1 << 20)
+
+
+def run_engine(pcap, mode, directory):
+    recorder = None
+    if mode:
+        recorder = CaptureRecorder(directory, max_bytes=8 << 20, summary=None if mode == "pcap" else mode)
+    with open(os.devnull, "w") as devnull:
+        writer = AsyncWriter(devnull)
+        monitor = FlowMonitor(writer)
+        stats = CaptureEngine(PcapReplaySource(pcap), aggregate_batch, monitor, lossless=True, record=recorder).run()
+        monitor.close()
+        writer.close()
+    if recorder:
+        recorder.close()
+    return stats
+
+
+if __name__ == "__main__":
+    packets = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    passes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    workdir = tempfile.mkdtemp()
+    pcap = sys.argv[3] if len(sys.argv) > 3 else make_pcap(os.path.join(workdir, "record.pcap"), packets)
+    print(f"📦 {packets} packets from {pcap}\n")
+
+    for label, mode in MODES:
+        directory = os.path.join(workdir, mode or "none")
+        os.makedirs(directory)
+        stats = run_engine(pcap, mode, directory)
+        print(f"{label:<16} {stats['packets_per_second']:9.0f} pkt/s   {disk_mb(directory):7.1f} MB on disk")
+        shutil.rmtree(directory)
+
+    print(f"\n🔁 recorder alone, {passes} passes, 8 MB files, keeping the newest 4")
+    batches = []
+    for item in PcapReplaySource(pcap):
+        if not batches or len(batches[-1]) == 256:
+            batches.append([])
+        batches[-1].append(item)
+    directory = os.path.join(workdir, "passes")
+    recorder = CaptureRecorder(directory, max_bytes=8 << 20, max_seconds=0, keep=4, summary="parquet")
+    for n in range(1, passes + 1):
+        start = time.perf_counter()
+        for batch in batches:
+            recorder(batch, 1)
+        elapsed = time.perf_counter() - start
+        # the recorder's queue is bounded, so this can't run more than 64 batches ahead of the disk
+        print(f"  pass {n}: {packets / elapsed:9.0f} pkt/s   RSS {rss_mb():6.1f} MB   "
+              f"{recorder.counters['files']} files so far, {disk_mb(directory):5.1f} MB on disk")
+    counters = recorder.close()
+    print(f"  {counters}")
+    shutil.rmtree(workdir)
@@ -0,0 +1,55 @@
+# ========================================
+# Capture-engine throughput on a replayed pcap
+# 1. classic sniff(prn=packet_callback) vs the engine, replayed as fast as
+#    it can be processed (lossless): packets/sec
+# 2. replay paced faster than the engine keeps up: packets/sec and drops
+# Output goes to /dev/null; only dissection + formatting is measured.
+# Usage: python bench_replay.py [packets] [pcap]
+# ========================================
+
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from scapy.all import sniff
+
+from capture import AsyncWriter, CaptureEngine, PcapReplaySource
+from make_pcap import make_pcap
+from Network_sniffer import packet_callback
+
+
+def run_engine(pcap, workers, lossless=True, rate=None, devnull=None):
+    writer = AsyncWriter(devnull)
+    engine = CaptureEngine(PcapReplaySource(pcap, rate), consume=writer, workers=workers, lossless=lossless)
+    stats = engine.run()
+    writer.close()
+    return stats
+
+
+if __name__ == "__main__":
+    packets = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    pcap = sys.argv[2] if len(sys.argv) > 2 else make_pcap(os.path.join(tempfile.mkdtemp(), "replay.pcap"), packets)
+    cores = os.cpu_count() or 1
+    print(f"📦 {packets} packets from {pcap}, {cores} CPU(s)\n")
+
+    with open(os.devnull, "w") as devnull:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            sniff(offline=pcap, prn=packet_callback, store=False)
+        print(f"{'classic sniff(prn=...)':<28} {packets / (time.perf_counter() - start):9.0f} pkt/s")
+
+        best = 0
+        for workers in sorted({0, 1, cores}):
+            stats = run_engine(pcap, workers, devnull=devnull)
+            best = max(best, stats["packets_per_second"])
+            print(f"{f'engine, {workers} worker(s)':<28} {stats['packets_per_second']:9.0f} pkt/s")
+
+        rate = best * 2
+        stats = run_engine(pcap, cores, lossless=False, rate=rate, devnull=devnull)
+        print(f"\n⚡ replayed at {rate:.0f} pkt/s (2x capacity): processed {stats['processed']}, "
+              f"dropped {stats['dropped']} ({stats['dropped'] / stats['captured']:.1%}), "
+              f"{stats['packets_per_second']:.0f} pkt/s")
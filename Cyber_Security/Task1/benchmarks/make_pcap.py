@@ -0,0 +1,48 @@
+# ========================================
+# Synthetic capture for the benchmarks
+# A mix of IPv4/IPv6 TCP and UDP (with payloads) plus ARP, spread over
+# `flows` 5-tuples. Packets are built once per flow with scapy and then
+# written many times, so even millions of packets take seconds.
+# Usage: python make_pcap.py out.pcap [packets] [flows]
+# ========================================
+
+import random
+import struct
+import sys
+
+from scapy.all import ARP, DNS, DNSQR, Ether, IP, IPv6, TCP, UDP, Raw
+
+
+def flow_packet(rng, i):
+    eth = Ether(src="02:00:00:00:00:01", dst="02:00:00:00:00:02")  # explicit MACs: no ARP/route lookups
+    kind = i % 10
+    src4, dst4 = f"10.0.{i % 250}.{i % 200 + 1}", f"192.168.{i % 7}.{i % 100 + 1}"
+    sport = rng.randrange(1024, 65535)
+    if kind < 5:
+        payload = b"GET /index.html HTTP/1.1\r\nHost: example.com\r\n\r\n" * rng.randrange(1, 8)
+        return eth / IP(src=src4, dst=dst4) / TCP(sport=sport, dport=80, flags="PA") / Raw(payload)
+    if kind < 7:
+        return eth / IP(src=src4, dst=dst4) / UDP(sport=sport, dport=53) / DNS(qd=DNSQR(qname=f"host{i}.example.com"))
+    if kind < 9:
+        return (eth / IPv6(src=f"2001:db8::{i:x}", dst=f"2001:db8:1::{i % 50:x}")
+                / TCP(sport=sport, dport=443, flags="A") / Raw(bytes(rng.randrange(0, 1200))))
+    return eth / ARP(psrc=src4, pdst=dst4)
+
+
+def make_pcap(path, packets=100000, flows=1000, seed=0):
+    rng = random.Random(seed)
+    templates = [bytes(flow_packet(rng, i)) for i in range(flows)]
+    ts = 1_700_000_000.0
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))  # pcap header, Ethernet
+        for n in range(packets):
+            frame = templates[rng.randrange(flows)]
+            ts += rng.expovariate(10000)  # ~10k packets/sec of capture time
+            sec = int(ts)
+            f.write(struct.pack("<IIII", sec, int((ts - sec) * 1e6), len(frame), len(frame)))
+            f.write(frame)
+    return path
+
+
+if __name__ == "__main__":
+    make_pcap(sys.argv[1], *(int(arg) for arg in sys.argv[2:4]))
@@ -0,0 +1,243 @@
+# ========================================
+# Kernel-side packet filtering
+# Classic BPF programs attached to the capture socket, so frames nobody
+# asked for are dropped in the kernel and never copied into Python.
+# Protocol selections ("tcp or udp") are compiled here; anything richer
+# ("port 80", "net 10.0.0.0/8", ...) needs libpcap, through scapy.
+# A replayed pcap runs the same program in userland (run()), so a filtered
+# replay shows exactly what the filtered live capture would have.
+# ========================================
+
+import ctypes
+import socket
+import struct
+
+SO_ATTACH_FILTER = 26
+
+# Instruction classes, sizes, modes and operations (linux/filter.h)
+LD, LDX, ST, STX, ALU, JMP, RET, MISC = range(8)
+W, H, B = 0x00, 0x08, 0x10
+IMM, ABS, IND, MEM, LEN, MSH = 0x00, 0x20, 0x40, 0x60, 0x80, 0xA0
+ADD, SUB, MUL, DIV, OR, AND, LSH, RSH, NEG, MOD, XOR = range(0x00, 0xB0, 0x10)
+JA, JEQ, JGT, JGE, JSET = 0x00, 0x10, 0x20, 0x30, 0x40
+SRC_X = 0x08
+RET_A = 0x10
+TXA = 0x80
+SIZES = {W: 4, H: 2, B: 1}
+
+ACCEPT = 0x40000  # accept the whole frame (libpcap's default snapshot length)
+
+ETHERTYPES = {"arp": 0x0806, "ip": 0x0800, "ip6": 0x86DD}
+IP_PROTOCOLS = {"tcp": (6, 6), "udp": (17, 17), "icmp": (1, None), "icmp6": (None, 58)}  # (IPv4, IPv6)
+PROTOCOLS = sorted(ETHERTYPES) + sorted(IP_PROTOCOLS)
+LINKTYPE_ETHERNET = 1
+RAW_IP_LINKTYPES = (101, 228, 229)
+
+
+class FilterError(ValueError):
+    pass
+
+
+def protocol_expression(protocols):
+    """--proto selections as a filter expression: ["tcp", "udp"] -> "tcp or udp"."""
+    return " or ".join(dict.fromkeys(protocols))
+
+
+def combine(expression=None, protocols=()):
+    """--filter and --proto as one expression, or None to capture everything."""
+    parts = [part for part in (expression, protocol_expression(protocols)) if part]
+    if len(parts) > 1:
+        return " and ".join(f"({part})" for part in parts)
+    return parts[0] if parts else None
+
+
+def compile_filter(expression, linktype=LINKTYPE_ETHERNET):
+    """Filter expression -> [(code, jt, jf, k), ...]."""
+    words = expression.split()
+    names = words[::2]
+    if all(name in PROTOCOLS for name in names) and all(word == "or" for word in words[1::2]) \
+            and len(words) % 2 == 1:
+        return protocol_program(names, linktype)
+    return libpcap_program(expression, linktype)
+
+
+def libpcap_program(expression, linktype):
+    from scapy.arch.common import compile_filter as pcap_compile
+    from scapy.arch.common import free_filter
+    from scapy.error import Scapy_Exception
+
+    try:
+        program = pcap_compile(expression, linktype=linktype)
+    except (ImportError, Scapy_Exception) as e:
+        raise FilterError(f"can't compile {expression!r}: {e} (without libpcap only "
+                          f"{' / '.join(PROTOCOLS)} joined by 'or' are supported)") from None
+    try:
+        return [(insn.code, insn.jt, insn.jf, insn.k & 0xFFFFFFFF) for insn in program.bf_insns[:program.bf_len]]
+    finally:
+        free_filter(program)
+
+
+def protocol_program(protocols, linktype=LINKTYPE_ETHERNET):
+    """Accepts frames of any of `protocols` (names from PROTOCOLS), drops the rest.
+
+    Like libpcap, the link layer is read at fixed offsets: VLAN-tagged
+    frames only match when the tag isn't there.
+    """
+    unknown = set(protocols) - set(PROTOCOLS)
+    if unknown:
+        raise FilterError(f"unknown protocol(s): {', '.join(sorted(unknown))}")
+    wanted = set(protocols)
+    ipv4 = "ip" in wanted or any(IP_PROTOCOLS[name][0] for name in wanted & IP_PROTOCOLS.keys())
+    ipv6 = "ip6" in wanted or any(IP_PROTOCOLS[name][1] for name in wanted & IP_PROTOCOLS.keys())
+
+    if linktype == LINKTYPE_ETHERNET:
+        offset = 14
+        code = [(LD | H | ABS, 0, 0, 12)]
+        if "arp" in wanted:
+            code.append((JMP | JEQ, "accept", 0, ETHERTYPES["arp"]))
+        if ipv4:
+            code.append((JMP | JEQ, "ipv4", 0, ETHERTYPES["ip"]))
+        if ipv6:
+            code.append((JMP | JEQ, "ipv6", 0, ETHERTYPES["ip6"]))
+    elif linktype in RAW_IP_LINKTYPES:
+        offset = 0
+        code = [(LD | B | ABS, 0, 0, 0), (ALU | RSH, 0, 0, 4)]  # version = first byte >> 4
+        if ipv4:
+            code.append((JMP | JEQ, "ipv4", 0, 4))
+        if ipv6:
+            code.append((JMP | JEQ, "ipv6", 0, 6))
+    else:
+        raise FilterError(f"no built-in protocol filter for link type {linktype}")
+    code.append((RET, 0, 0, 0))
+
+    # protocol field: IPv4 header byte 9, IPv6 next header (byte 6)
+    for label, present, wanted_all, field, column in (("ipv4", ipv4, "ip", 9, 0), ("ipv6", ipv6, "ip6", 6, 1)):
+        if not present:
+            continue
+        numbers = [IP_PROTOCOLS[name][column] for name in sorted(wanted & IP_PROTOCOLS.keys())]
+        code.append(label)
+        if wanted_all in wanted:
+            code.append((RET, 0, 0, ACCEPT))
+            continue
+        code.append((LD | B | ABS, 0, 0, offset + field))
+        code += [(JMP | JEQ, "accept", 0, number) for number in numbers if number is not None]
+        code.append((RET, 0, 0, 0))
+
+    code += ["accept", (RET, 0, 0, ACCEPT)]
+    return assemble(code)
+
+
+def assemble(code):
+    """Resolves label names used as jump targets into relative offsets."""
+    labels = {}
+    count = 0
+    for line in code:
+        if isinstance(line, str):
+            labels[line] = count
+        else:
+            count += 1
+    program = []
+    for line in code:
+        if isinstance(line, str):
+            continue
+        op, jt, jf, k = line
+        here = len(program) + 1
+        jt = labels[jt] - here if isinstance(jt, str) else jt
+        jf = labels[jf] - here if isinstance(jf, str) else jf
+        program.append((op, jt, jf, k))
+    return program
+
+
+# ========================================
+# Running a program
+# ========================================
+def attach(sock, program):
+    """Installs `program` on a socket (SO_ATTACH_FILTER); the kernel keeps its own copy."""
+    insns = ctypes.create_string_buffer(b"".join(struct.pack("HBBI", *insn) for insn in program))  # sock_filter[]
+    fprog = struct.pack("HP", len(program), ctypes.addressof(insns))  # struct sock_fprog
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
+def run(program, frame):
+    """Interprets `program` on one frame: bytes of it to keep, 0 to drop it."""
+    a = x = 0
+    mem = [0] * 16
+    n = len(frame)
+    pc = 0
+    while True:
+        code, jt, jf, k = program[pc]
+        pc += 1
+        cls = code & 0x07
+        if cls == LD or cls == LDX:
+            mode = code & 0xE0
+            if mode == IMM:
+                value = k
+            elif mode == LEN:
+                value = n
+            elif mode == MEM:
+                value = mem[k]
+            elif mode == MSH:
+                if k >= n:
+                    return 0
+                value = (frame[k] & 0x0F) * 4
+            else:
+                start = k + x if mode == IND else k
+                end = start + SIZES[code & 0x18]
+                if end > n:
+                    return 0  # out-of-bounds loads reject, as in the kernel
+                value = int.from_bytes(frame[start:end], "big")
+            if cls == LD:
+                a = value
+            else:
+                x = value
+        elif cls == ST:
+            mem[k] = a
+        elif cls == STX:
+            mem[k] = x
+        elif cls == ALU:
+            op = code & 0xF0
+            operand = x if code & SRC_X else k
+            if op == ADD:
+                a += operand
+            elif op == SUB:
+                a -= operand
+            elif op == MUL:
+                a *= operand
+            elif op in (DIV, MOD):
+                if not operand:
+                    return 0
+                a = a // operand if op == DIV else a % operand
+            elif op == OR:
+                a |= operand
+            elif op == AND:
+                a &= operand
+            elif op == LSH:
+                a <<= operand
+            elif op == RSH:
+                a >>= operand
+            elif op == NEG:
+                a = -a
+            elif op == XOR:
+                a ^= operand
+            a &= 0xFFFFFFFF
+        elif cls == JMP:
+            op = code & 0xF0
+            if op == JA:
+                pc += k
+                continue
+            operand = x if code & SRC_X else k
+            if op == JEQ:
+                taken = a == operand
+            elif op == JGT:
+                taken = a > operand
+            elif op == JGE:
+                taken = a >= operand
+            else:
+                taken = bool(a & operand)
+            pc += jt if taken else jf
+        elif cls == RET:
+            return a if code & 0x18 == RET_A else k
+        elif code & 0xF8 == TXA:
+            a = x
+        else:  # TAX
+            x = a
@@ -0,0 +1,351 @@
+# ========================================
+# High-rate capture engine
+# reader thread -> bounded queue of frame batches
+#   -> worker processes (dissection) -> async output
+# ========================================
+
+import os
+import queue
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from scapy.all import RawPcapReader, conf
+
+import bpf
+from dissect import dissect_batch
+
+ETH_P_ALL = 0x0003
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+PACKET_OUTGOING = 4
+SO_RCVBUFFORCE = 33
+LINKTYPE_ETHERNET = 1
+
+
+# ========================================
+# Frame sources
+# Iterables of (timestamp, frame bytes, length on the wire); None means
+# "nothing arrived lately", so the reader can flush a partial batch.
+# `program` is a BPF filter (bpf.compile_filter) and `snaplen` the most
+# bytes kept of each frame; the wire length is what flows count.
+# ========================================
+class PcapReplaySource:
+    """Frames from a pcap file, as fast as possible or paced at `rate` packets/sec.
+
+    The filter runs in the reader thread, since there's no kernel in the way.
+    """
+
+    def __init__(self, path, rate=None, expression=None, snaplen=None):
+        self.path = path
+        self.rate = rate
+        self.snaplen = snaplen
+        with RawPcapReader(path) as reader:
+            self.linktype = reader.linktype
+        self.program = bpf.compile_filter(expression, self.linktype) if expression else None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        program, snaplen = self.program, self.snaplen
+        with RawPcapReader(self.path) as reader:
+            for n, (frame, meta) in enumerate(reader):
+                if self.rate and n % 256 == 0:
+                    ahead = n / self.rate - (time.perf_counter() - start)
+                    if ahead > 0:
+                        time.sleep(ahead)
+                if program is not None:
+                    keep = bpf.run(program, frame)
+                    if not keep:
+                        continue
+                    frame = frame[:keep]
+                yield meta.sec + meta.usec / 1e6, frame[:snaplen], meta.wirelen
+
+    def kernel_drops(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+class AfPacketSource:
+    """Live Ethernet frames from an AF_PACKET socket (Linux, needs root).
+
+    The kernel socket buffer (`buffer_bytes`) is the ring frames wait in while
+    the reader is busy; what overflows it is reported by kernel_drops(). The
+    filter runs in the kernel, so rejected frames never reach that buffer,
+    and only the first `snaplen` bytes of a frame are copied out of it.
+    """
+
+    linktype = LINKTYPE_ETHERNET
+
+    def __init__(self, iface=None, snaplen=None, buffer_bytes=64 << 20, expression=None):
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, buffer_bytes)  # past net.core.rmem_max
+        except OSError:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_bytes)
+        if expression:
+            bpf.attach(self.sock, bpf.compile_filter(expression, self.linktype))
+            self.discard_queued()  # frames that arrived before the filter was attached
+        if iface:
+            self.sock.bind((iface, 0))
+        self.sock.settimeout(0.2)
+        self.snaplen = snaplen or 65535
+        self.drops = 0
+
+    def discard_queued(self):
+        self.sock.setblocking(False)
+        try:
+            while True:
+                self.sock.recv(1)
+        except BlockingIOError:
+            pass
+
+    def __iter__(self):
+        snaplen = self.snaplen
+        buffer = bytearray(snaplen)
+        view = memoryview(buffer)
+        recvfrom_into = self.sock.recvfrom_into
+        while True:
+            try:
+                # MSG_TRUNC: the kernel copies at most snaplen bytes but returns the full length
+                wirelen, (ifname, _, pkttype, _, _) = recvfrom_into(buffer, snaplen, socket.MSG_TRUNC)
+            except socket.timeout:
+                yield None
+                continue
+            except OSError:  # closed
+                return
+            if pkttype == PACKET_OUTGOING and ifname == "lo":
+                continue  # loopback delivers every frame twice: once sent, once received
+            yield time.time(), bytes(view[:min(wirelen, snaplen)]), wirelen
+
+    def kernel_drops(self):
+        # struct tpacket_stats; the kernel resets it on every read
+        if self.sock.fileno() != -1:
+            packets, drops = struct.unpack("II", self.sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, 8))
+            self.drops += drops
+        return self.drops
+
+    def close(self):
+        self.kernel_drops()
+        self.sock.close()
+
+
+class ScapySource:
+    """Live frames through scapy's L2 listen socket (libpcap / Npcap), for non-Linux hosts."""
+
+    def __init__(self, iface=None, snaplen=None, expression=None):
+        self.sock = conf.L2listen(iface=iface, filter=expression)  # compiled and attached by libpcap
+        self.linktype = conf.l2types.layer2num.get(self.sock.LL, LINKTYPE_ETHERNET)
+        self.snaplen = snaplen
+        self.closed = False
+
+    def __iter__(self):
+        while not self.closed:
+            if not self.sock.select([self.sock], 0.2):
+                yield None
+                continue
+            _, frame, ts = self.sock.recv_raw()
+            if frame:
+                yield ts or time.time(), frame[:self.snaplen], len(frame)
+
+    def kernel_drops(self):
+        return 0
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+def open_source(iface=None, read=None, rate=None, expression=None, snaplen=None):
+    """The best source for this host; `expression` is a BPF filter (raises bpf.FilterError)."""
+    if read:
+        return PcapReplaySource(read, rate, expression, snaplen)
+    if hasattr(socket, "AF_PACKET"):
+        return AfPacketSource(iface, snaplen, expression=expression)
+    return ScapySource(iface, snaplen, expression)
+
+
+# ========================================
+# Async output
+# ========================================
+class AsyncWriter:
+    """Writes text chunks on a background thread, so slow stdout never stalls dissection.
+
+    The queue is bounded: if output can't keep up, the engine slows down and
+    the capture queue drops instead of memory growing.
+    """
+
+    def __init__(self, stream=sys.stdout, max_chunks=64):
+        self.stream = stream
+        self.chunks = queue.Queue(max_chunks)
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+
+    def drain(self):
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.stream.flush()
+                return
+            self.stream.write(chunk)
+            if self.chunks.empty():
+                self.stream.flush()
+
+    def __call__(self, chunk):
+        if chunk:
+            self.chunks.put(chunk)
+
+    def close(self):
+        self.chunks.put(None)
+        self.thread.join()
+
+
+# ========================================
+# Engine
+# ========================================
+def ignore_sigint():
+    # Workers leave Ctrl+C to the engine, which drains them and shuts them down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class CaptureEngine:
+    """Decouples capture from dissection so the reader never waits on Python work.
+
+    A reader thread turns frames into batches of `batch_size` and puts them on
+    a queue of at most `queue_batches` batches. When the queue is full, the
+    batch is dropped and counted (or waited for with lossless=True, for
+    replays). Batches are processed with `process(batch, linktype)`. This
+    happens on `workers` processes, or inline if workers=0. Results are handed
+    to `consume` in capture order. If given, `record(batch, linktype)` is
+    called with every batch as it's dispatched (recorder.CaptureRecorder).
+    """
+
+    def __init__(self, source, process=dissect_batch, consume=None, workers=None, batch_size=256,
+                 queue_batches=64, flush_interval=0.2, lossless=False, record=None):
+        self.source = source
+        self.process = process
+        self.record = record
+        self.owns_consume = consume is None
+        self.consume = consume or AsyncWriter()
+        self.workers = os.cpu_count() if workers is None else workers
+        self.batch_size = batch_size
+        self.batches = queue.Queue(queue_batches)
+        self.flush_interval = flush_interval
+        self.lossless = lossless
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.counters = {"captured": 0, "dropped": 0, "processed": 0, "batches": 0}
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    # ---------- reader thread ----------
+    def read(self):
+        batch = []
+        flushed = time.monotonic()
+        try:
+            for item in self.source:
+                if self.stopping.is_set():
+                    break
+                if item is not None:
+                    batch.append(item)
+                if batch and (len(batch) >= self.batch_size or time.monotonic() - flushed >= self.flush_interval):
+                    self.enqueue(batch)
+                    batch = []
+                    flushed = time.monotonic()
+            if batch:
+                self.enqueue(batch)
+        finally:
+            self.batches.put(None)
+
+    def enqueue(self, batch):
+        self.count("captured", len(batch))
+        if self.lossless:
+            self.batches.put(batch)
+            return
+        try:
+            self.batches.put_nowait(batch)
+        except queue.Full:
+            self.count("dropped", len(batch))
+
+    # ---------- dispatch (caller's thread) ----------
+    def run(self):
+        """Captures until the source ends or stop()/Ctrl+C; returns summary()."""
+        self.started = time.perf_counter()
+        reader = threading.Thread(target=self.read, daemon=True)
+        reader.start()
+        # First Ctrl+C stops capturing but still processes what was captured; a second one aborts
+        previous = None
+        if threading.current_thread() is threading.main_thread():
+            previous = signal.signal(signal.SIGINT, self.interrupt)
+        try:
+            if self.workers:
+                self.dispatch_pool()
+            else:
+                self.dispatch_inline()
+        finally:
+            if previous is not None:
+                signal.signal(signal.SIGINT, previous)
+            self.stop()
+            reader.join(timeout=1)
+            if self.owns_consume:
+                self.consume.close()
+        return self.summary()
+
+    def interrupt(self, signum, frame):
+        if self.stopping.is_set():
+            raise KeyboardInterrupt
+        self.stop()
+
+    def dispatch_inline(self):
+        linktype = self.source.linktype
+        while (batch := self.batches.get()) is not None:
+            if self.record:
+                self.record(batch, linktype)
+            self.consume(self.process(batch, linktype))
+            self.done(len(batch))
+
+    def dispatch_pool(self):
+        linktype = self.source.linktype
+        max_pending = self.workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_sigint) as pool:
+            while (batch := self.batches.get()) is not None:
+                pending.append((pool.submit(self.process, batch, linktype), len(batch)))
+                if self.record:
+                    self.record(batch, linktype)  # written while the workers dissect it
+                # Hand results on in capture order; block only when enough work is queued up
+                while pending and (len(pending) >= max_pending or pending[0][0].done()):
+                    self.finish(*pending.popleft())
+            while pending:
+                self.finish(*pending.popleft())
+
+    def finish(self, future, size):
+        self.consume(future.result())
+        self.done(size)
+
+    def done(self, size):
+        self.count("processed", size)
+        self.count("batches")
+
+    def stop(self):
+        if not self.stopping.is_set():
+            self.stopping.set()
+            self.source.close()
+
+    # ---------- reporting ----------
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        with self.lock:
+            stats = dict(self.counters)
+        stats["kernel_dropped"] = self.source.kernel_drops()
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["packets_per_second"] = round(stats["processed"] / elapsed, 1) if elapsed else 0.0
+        return stats
@@ -0,0 +1,159 @@
+# ========================================
+# Fast-path header decoder
+# Ethernet (+802.1Q) / IPv4 / IPv6 / TCP / UDP straight from the raw
+# bytes with struct, payload as a zero-copy memoryview slice. Anything it
+# can't reproduce exactly (fragments, IPv6 extension headers, ICMP, ports
+# scapy dissects as an application protocol, ...) returns None, and the
+# caller falls back to full scapy dissection.
+# ========================================
+
+import socket
+import struct
+
+from scapy.all import TCP, UDP
+
+ETH_HEADER = struct.Struct("!6s6sH")
+VLAN_TAG = struct.Struct("!HH")
+IPV4_HEADER = struct.Struct("!BBHHHBBH4s4s")
+IPV6_HEADER = struct.Struct("!IHBB16s16s")
+PORTS = struct.Struct("!HH")
+TCP_OFFSET = struct.Struct("!12xB")
+UDP_LENGTH = struct.Struct("!4xH")
+
+ETHERTYPE_IPV4, ETHERTYPE_IPV6, ETHERTYPE_ARP, ETHERTYPE_VLAN = 0x0800, 0x86DD, 0x0806, 0x8100
+LINKTYPE_ETHERNET, LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6 = 1, 101, 228, 229
+PROTO_TCP, PROTO_UDP = 6, 17
+
+
+def bound_ports(layer):
+    """Ports scapy hands to a protocol dissector instead of Raw (DNS, NTP, SMB, ...)."""
+    return frozenset(fields[key] for fields, _ in layer.payload_guess
+                     for key in ("sport", "dport") if key in fields)
+
+
+SCAPY_PORTS = {PROTO_TCP: bound_ports(TCP), PROTO_UDP: bound_ports(UDP)}
+
+
+def link_payload(view, linktype):
+    """(ethertype, offset of the network header), or None for link layers we don't parse."""
+    if linktype == LINKTYPE_ETHERNET:
+        if len(view) < ETH_HEADER.size:
+            return None
+        ethertype = ETH_HEADER.unpack_from(view)[2]
+        offset = ETH_HEADER.size
+        if ethertype == ETHERTYPE_VLAN:
+            if len(view) < offset + VLAN_TAG.size:
+                return None
+            ethertype = VLAN_TAG.unpack_from(view, offset)[1]
+            offset += VLAN_TAG.size
+        return ethertype, offset
+    if linktype in (LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6) and len(view):
+        return (ETHERTYPE_IPV4 if view[0] >> 4 == 4 else ETHERTYPE_IPV6), 0
+    return None
+
+
+def decode(frame, linktype=LINKTYPE_ETHERNET):
+    """Fields packet_callback prints, or None when scapy has to dissect the frame.
+
+    Returns {"ip": (src, dst, proto, ttl) or None,
+             "l4": ("TCP" | "UDP", sport, dport) or None,
+             "payload": memoryview or None}
+    """
+    view = memoryview(frame)
+    link = link_payload(view, linktype)
+    if link is None:
+        return None
+    ethertype, offset = link
+    if ethertype == ETHERTYPE_ARP:
+        return {"ip": None, "l4": None, "payload": None}
+    if ethertype == ETHERTYPE_IPV4:
+        return decode_ipv4(view, offset)
+    if ethertype == ETHERTYPE_IPV6:
+        return decode_ipv6(view, offset)
+    return None
+
+
+def decode_ipv4(view, offset):
+    if len(view) < offset + IPV4_HEADER.size:
+        return None
+    version_ihl, _, total_length, _, flags_fragment, ttl, proto, _, src, dst = IPV4_HEADER.unpack_from(view, offset)
+    header_length = (version_ihl & 0x0F) * 4
+    if version_ihl >> 4 != 4 or header_length < 20 or total_length < header_length or flags_fragment & 0x3FFF:
+        return None  # malformed, or a fragment (MF set / non-zero offset)
+    if proto not in (PROTO_TCP, PROTO_UDP):
+        return None
+    end = min(len(view), offset + total_length)  # anything past total_length is Ethernet padding
+    l4 = decode_l4(view, offset + header_length, end, proto)
+    if l4 is None:
+        return None
+    ip = (socket.inet_ntoa(src), socket.inet_ntoa(dst), proto, ttl)
+    return {"ip": ip, "l4": l4[0], "payload": l4[1]}
+
+
+def decode_ipv6(view, offset):
+    if len(view) < offset + IPV6_HEADER.size:
+        return None
+    version_class_flow, payload_length, next_header, _, _, _ = IPV6_HEADER.unpack_from(view, offset)
+    if version_class_flow >> 28 != 6 or next_header not in (PROTO_TCP, PROTO_UDP):
+        return None  # extension headers, ICMPv6, ...
+    start = offset + IPV6_HEADER.size
+    l4 = decode_l4(view, start, min(len(view), start + payload_length), next_header)
+    if l4 is None:
+        return None
+    # packet_callback only prints IPv4 ([IP]) details
+    return {"ip": None, "l4": l4[0], "payload": l4[1]}
+
+
+def decode_l4(view, start, end, proto):
+    """((name, sport, dport), payload view or None), or None to fall back."""
+    if end - start < 8:
+        return None
+    sport, dport = PORTS.unpack_from(view, start)
+    if sport in SCAPY_PORTS[proto] or dport in SCAPY_PORTS[proto]:
+        return None
+
+    if proto == PROTO_TCP:
+        header_length = (TCP_OFFSET.unpack_from(view, start)[0] >> 4) * 4
+        if header_length < 20 or start + header_length > end:
+            return None
+        payload_start = start + header_length
+        name = "TCP"
+    else:
+        udp_length = UDP_LENGTH.unpack_from(view, start)[0]
+        if udp_length < 8:
+            return None
+        end = min(end, start + udp_length)
+        payload_start = start + 8
+        name = "UDP"
+
+    payload = view[payload_start:end] if end > payload_start else None
+    return (name, sport, dport), payload
+
+
+def flow_key(frame, linktype=LINKTYPE_ETHERNET):
+    """(proto, src, dst, sport, dport) with packed addresses, or None if the frame isn't IP.
+
+    Ports are 0 for protocols without them and for non-first fragments.
+    """
+    view = memoryview(frame)
+    link = link_payload(view, linktype)
+    if link is None:
+        return None
+    ethertype, offset = link
+
+    if ethertype == ETHERTYPE_IPV4 and len(view) >= offset + IPV4_HEADER.size:
+        version_ihl, _, _, _, flags_fragment, _, proto, _, src, dst = IPV4_HEADER.unpack_from(view, offset)
+        start = offset + (version_ihl & 0x0F) * 4
+        has_ports = not flags_fragment & 0x1FFF
+    elif ethertype == ETHERTYPE_IPV6 and len(view) >= offset + IPV6_HEADER.size:
+        _, _, proto, _, src, dst = IPV6_HEADER.unpack_from(view, offset)
+        start = offset + IPV6_HEADER.size
+        has_ports = True
+    else:
+        return None
+
+    if has_ports and proto in (PROTO_TCP, PROTO_UDP) and len(view) >= start + PORTS.size:
+        sport, dport = PORTS.unpack_from(view, start)
+    else:
+        sport = dport = 0
+    return proto, src, dst, sport, dport
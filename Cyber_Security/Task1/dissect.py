@@ -0,0 +1,83 @@
+# ========================================
+# Packet dissection shared by the classic sniff() loop
+# and the capture engine's worker processes
+# ========================================
+
+from scapy.all import conf, IP, TCP, UDP, Raw
+
+from decoder import decode
+
+
+def packet_fields(packet):
+    """The fields packet_callback prints, from a dissected scapy packet (same shape as decoder.decode)."""
+    fields = {"ip": None, "l4": None, "payload": None}
+
+    # IP Layer
+    if packet.haslayer(IP):
+        ip = packet[IP]
+        fields["ip"] = (ip.src, ip.dst, ip.proto, ip.ttl)
+
+    # TCP Layer
+    if packet.haslayer(TCP):
+        tcp = packet[TCP]
+        fields["l4"] = ("TCP", tcp.sport, tcp.dport)
+
+    # UDP Layer
+    elif packet.haslayer(UDP):
+        udp = packet[UDP]
+        fields["l4"] = ("UDP", udp.sport, udp.dport)
+
+    # Payload (application data inside packet)
+    if packet.haslayer(Raw):
+        fields["payload"] = packet[Raw].load
+
+    return fields
+
+
+def format_fields(fields, preview=None):
+    """The printed block; `preview` caps the payload bytes shown (0 hides payloads)."""
+    lines = ["\n=== New Packet Captured ==="]
+
+    if fields["ip"]:
+        src, dst, proto, ttl = fields["ip"]
+        lines.append(f"[IP] Src: {src} -> Dst: {dst}")
+        lines.append(f"    Protocol: {proto}, TTL: {ttl}")
+
+    if fields["l4"]:
+        name, sport, dport = fields["l4"]
+        lines.append(f"[{name}] Src Port: {sport} -> Dst Port: {dport}")
+
+    payload = fields["payload"]
+    if payload is not None and preview is not None:
+        payload = payload[:preview] or None
+    if payload is not None:
+        try:
+            text = str(payload, "utf-8", "ignore")
+            lines.append(f"[Payload] {text}")
+        except Exception:
+            lines.append(f"[Payload - Raw Bytes] {bytes(payload)}")
+
+    return "\n".join(lines)
+
+
+def format_packet(packet, preview=None):
+    """The block packet_callback prints for one scapy packet."""
+    return format_fields(packet_fields(packet), preview)
+
+
+def dissect_frame(frame, linktype=1, fast=True, preview=None):
+    """Raw frame bytes -> printed block.
+
+    Common TCP/UDP traffic is decoded straight from the bytes; everything else
+    is dissected by the scapy layer for the capture's link type.
+    """
+    fields = decode(frame, linktype) if fast else None
+    if fields is None:
+        layer = conf.l2types.num2layer.get(linktype, conf.raw_layer)
+        fields = packet_fields(layer(frame))
+    return format_fields(fields, preview)
+
+
+def dissect_batch(batch, linktype=1, fast=True, preview=None):
+    """Worker entry point: [(timestamp, frame, wire length), ...] -> one chunk of output text."""
+    return "".join(dissect_frame(frame, linktype, fast, preview) + "\n" for _, frame, _ in batch)
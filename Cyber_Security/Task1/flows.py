@@ -0,0 +1,236 @@
+# ========================================
+# Flow aggregation mode
+# Workers fold each batch into per-5-tuple counts; the capture process
+# merges them into a bounded flow table and prints a report every
+# `interval` seconds (of capture time): flows that ended + top talkers.
+# ========================================
+
+import socket
+import time
+from array import array
+from collections import Counter, OrderedDict
+
+from decoder import flow_key
+
+PROTO_NAMES = {1: "ICMP", 6: "TCP", 17: "UDP", 58: "ICMPv6"}
+
+
+def aggregate_batch(batch, linktype=1):
+    """Worker entry point: [(timestamp, frame, wirelen), ...] -> ({key: [packets, bytes, first, last]}, non-IP count).
+
+    Bytes are counted as they were on the wire, not as captured (--snaplen).
+    """
+    flows = {}
+    skipped = 0
+    for ts, frame, wirelen in batch:
+        key = flow_key(frame, linktype)
+        if key is None:
+            skipped += 1
+            continue
+        counts = flows.get(key)
+        if counts is None:
+            flows[key] = [1, wirelen, ts, ts]
+        else:
+            counts[0] += 1
+            counts[1] += wirelen
+            counts[3] = ts
+    return flows, skipped
+
+
+# ========================================
+# Flow table
+# ========================================
+class FlowTable:
+    """At most `max_flows` flows in preallocated arrays, one slot per flow.
+
+    `slots` maps key -> slot and is kept in least-recently-seen order, so
+    idle flows are found from the front without a scan and, when the table
+    is full, the least recently seen flow is evicted to make room. Flows are
+    also exported once they've been open `active_timeout` seconds, like
+    NetFlow, so long-lived flows still show up in reports; their next packet
+    starts a new record.
+    """
+
+    def __init__(self, max_flows=65536, idle_timeout=15, active_timeout=120):
+        self.max_flows = max_flows
+        self.idle_timeout = idle_timeout
+        self.active_timeout = active_timeout
+        self.slots = OrderedDict()
+        self.free = list(range(max_flows - 1, -1, -1))
+        self.packets = array("Q", bytes(8 * max_flows))
+        self.bytes = array("Q", bytes(8 * max_flows))
+        self.first = array("d", bytes(8 * max_flows))
+        self.last = array("d", bytes(8 * max_flows))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, key, packets, nbytes, first, last):
+        """Counts packets for a flow; returns the record of a flow evicted to make room, if any."""
+        evicted = None
+        slot = self.slots.get(key)
+        if slot is None:
+            if not self.free:
+                evicted = self.pop(next(iter(self.slots)), "evicted")
+            slot = self.free.pop()
+            self.slots[key] = slot
+            self.packets[slot] = self.bytes[slot] = 0
+            self.first[slot] = first
+            self.last[slot] = last
+        else:
+            self.slots.move_to_end(key)
+            self.last[slot] = max(self.last[slot], last)
+        self.packets[slot] += packets
+        self.bytes[slot] += nbytes
+        return evicted
+
+    def pop(self, key, reason):
+        slot = self.slots.pop(key)
+        self.free.append(slot)
+        return key, self.packets[slot], self.bytes[slot], self.first[slot], self.last[slot], reason
+
+    def expire(self, now):
+        """Records of flows idle for idle_timeout, plus active_timeout exports."""
+        expired = []
+        while self.slots:
+            key, slot = next(iter(self.slots.items()))
+            if now - self.last[slot] < self.idle_timeout:
+                break
+            expired.append(self.pop(key, "idle"))
+        # The next packet of an exported flow opens a new record, timed from that packet
+        for key in [key for key, slot in self.slots.items() if now - self.first[slot] >= self.active_timeout]:
+            expired.append(self.pop(key, "active"))
+        return expired
+
+    def drain(self):
+        return [self.pop(key, "end") for key in list(self.slots)]
+
+
+# ========================================
+# Reporting
+# ========================================
+def format_address(packed):
+    return socket.inet_ntop(socket.AF_INET if len(packed) == 4 else socket.AF_INET6, packed)
+
+
+def format_size(nbytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if nbytes < 1024 or unit == "GB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+
+def format_flow(record):
+    (proto, src, dst, sport, dport), packets, nbytes, first, last, reason = record
+    name = PROTO_NAMES.get(proto, f"proto {proto}")
+    ports = f":{sport} -> {format_address(dst)}:{dport}" if sport or dport else f" -> {format_address(dst)}"
+    return (f"[Flow] {name} {format_address(src)}{ports}  packets={packets} bytes={nbytes} "
+            f"duration={last - first:.1f}s ({reason})")
+
+
+class TopTalkers:
+    """Approximate bytes/packets per source in bounded memory (Misra-Gries).
+
+    At most 2 * `capacity` sources are tracked. When that fills up, the
+    `capacity` heaviest are kept and the next one's byte count is subtracted
+    from them, so a source is undercounted by at most total bytes / capacity
+    and every source above that share is still listed, however many
+    (spoofed) sources there are.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.bytes = Counter()
+        self.packets = Counter()
+
+    def __len__(self):
+        return len(self.bytes)
+
+    def add(self, address, nbytes, packets):
+        self.bytes[address] += nbytes
+        self.packets[address] += packets
+        if len(self.bytes) > 2 * self.capacity:
+            self.compact()
+
+    def compact(self):
+        ranked = self.bytes.most_common(self.capacity + 1)
+        floor = ranked[-1][1]
+        self.bytes = Counter({address: nbytes - floor for address, nbytes in ranked[:-1] if nbytes > floor})
+        self.packets = Counter({address: self.packets[address] for address in self.bytes})
+
+    def most_common(self, n):
+        return [(address, nbytes, self.packets[address]) for address, nbytes in self.bytes.most_common(n)]
+
+    def clear(self):
+        self.bytes.clear()
+        self.packets.clear()
+
+
+class FlowMonitor:
+    """Engine consumer: merges worker aggregates and writes a report every `interval` seconds.
+
+    Time is taken from packet timestamps, so a replayed pcap is reported
+    the same way as the live capture was. Memory stays bounded between
+    reports too: at most `max_listed` evicted flows are kept for the next
+    report (the rest are only counted), and talkers are a TopTalkers sketch.
+    """
+
+    def __init__(self, write, table=None, interval=10, top=10, max_listed=1000, talker_capacity=1024):
+        self.write = write
+        self.table = table if table is not None else FlowTable()
+        self.interval = interval
+        self.top = top
+        self.max_listed = max_listed
+        self.next_report = None
+        self.now = 0.0
+        self.finished = []
+        self.unlisted = 0  # evicted this interval past max_listed
+        self.talkers = TopTalkers(talker_capacity)  # source address -> bytes/packets this interval
+        self.counters = {"packets": 0, "non_ip": 0, "evicted": 0, "unlisted": 0}
+
+    def __call__(self, result):
+        flows, skipped = result
+        self.counters["non_ip"] += skipped
+        for key, (packets, nbytes, first, last) in flows.items():
+            self.counters["packets"] += packets
+            self.talkers.add(key[1], nbytes, packets)
+            self.now = max(self.now, last)
+            evicted = self.table.add(key, packets, nbytes, first, last)
+            if evicted:
+                self.counters["evicted"] += 1
+                self.evicted(evicted)
+
+        if self.next_report is None and self.now:
+            self.next_report = self.now + self.interval
+        if self.next_report is not None and self.now >= self.next_report:
+            self.report(self.table.expire(self.now))
+            self.next_report = self.now + self.interval
+
+    def evicted(self, record):
+        if len(self.finished) < self.max_listed:
+            self.finished.append(record)
+        else:
+            self.unlisted += 1
+            self.counters["unlisted"] += 1
+
+    def report(self, expired):
+        # `expired` comes out of the table, so it's bounded by max_flows already
+        finished, self.finished = self.finished + expired, []
+        unlisted, self.unlisted = self.unlisted, 0
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.now))
+        lines = [f"\n=== Flows @ {stamp}: {len(self.table)} active, {len(finished) + unlisted} exported, "
+                 f"{self.counters['packets']} packets seen ==="]
+        lines += [format_flow(record) for record in finished]
+        if unlisted:
+            lines.append(f"[... {unlisted} more exported flows not listed]")
+        if self.talkers:
+            lines.append(f"[Top talkers, last {self.interval:g}s]")
+            for rank, (address, nbytes, packets) in enumerate(self.talkers.most_common(self.top), 1):
+                lines.append(f"  {rank}. {format_address(address):<39} {format_size(nbytes):>10}  "
+                             f"({packets} packets)")
+        self.talkers.clear()
+        self.write("\n".join(lines) + "\n")
+
+    def close(self):
+        """Final report with every flow still open."""
+        self.report(self.table.drain())
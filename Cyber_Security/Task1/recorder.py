@@ -0,0 +1,233 @@
+# ========================================
+# Capture recorder
+# Keeps what was captured for offline analysis: rotating pcap files, each
+# with an optional Parquet / Arrow packet-summary file next to it. Batches
+# are written on a background thread, one write() per batch, and every
+# file is closed (and complete) once it's rotated out.
+# ========================================
+
+import os
+import queue
+import struct
+import threading
+import time
+from collections import deque
+
+from decoder import flow_key
+from flows import format_address
+
+# Optional columnar output
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+PCAP_HEADER = struct.Struct("<IHHiIII")
+PCAP_RECORD = struct.Struct("<IIII")
+PCAP_MAGIC = 0xA1B2C3D4  # microsecond timestamps
+MAX_SNAPLEN = 262144
+
+
+# ========================================
+# pcap
+# ========================================
+class PcapFile:
+    """One pcap file; each batch goes out as a single buffered write."""
+
+    def __init__(self, path, linktype, snaplen=MAX_SNAPLEN):
+        self.path = path
+        self.file = open(path, "wb", buffering=1 << 20)
+        self.file.write(PCAP_HEADER.pack(PCAP_MAGIC, 2, 4, 0, 0, snaplen, linktype))
+        self.size = PCAP_HEADER.size
+        self.packets = 0
+
+    def write(self, batch):
+        pack = PCAP_RECORD.pack
+        parts = []
+        for ts, frame, wirelen in batch:
+            sec = int(ts)
+            usec = round((ts - sec) * 1e6)
+            if usec == 1000000:
+                sec, usec = sec + 1, 0
+            parts.append(pack(sec, usec, len(frame), wirelen))
+            parts.append(frame)
+        data = b"".join(parts)
+        self.file.write(data)
+        self.size += len(data)
+        self.packets += len(batch)
+
+    def close(self):
+        self.file.close()
+
+
+# ========================================
+# Packet summaries (one row per packet)
+# ========================================
+class SummaryFile:
+    """Parquet or Arrow IPC file of per-packet summaries.
+
+    Rows are buffered into row groups of `row_group_size`, so memory stays
+    bounded however long the file is kept open. `packet` is the packet's
+    index in the pcap file named in `pcap`, for going back to the frame.
+    """
+
+    def __init__(self, path, pcap_name, row_group_size=65536):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet/Arrow packet summaries")
+        self.path = path
+        self.pcap_name = pcap_name
+        self.row_group_size = row_group_size
+        self.schema = pa.schema([
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("pcap", pa.dictionary(pa.int32(), pa.string())),
+            ("packet", pa.uint64()),
+            ("wire_length", pa.uint32()),
+            ("captured_length", pa.uint32()),
+            ("proto", pa.uint8()),
+            ("src", pa.string()),
+            ("dst", pa.string()),
+            ("sport", pa.uint16()),
+            ("dport", pa.uint16()),
+        ])
+        if path.endswith(".parquet"):
+            self.sink = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self.sink = pa.ipc.new_file(path, self.schema)
+        self.columns = {name: [] for name in self.schema.names if name != "pcap"}
+        self.rows = 0
+
+    def write(self, batch, linktype):
+        columns = self.columns
+        for ts, frame, wirelen in batch:
+            key = flow_key(frame, linktype)
+            proto, src, dst, sport, dport = key or (None, None, None, None, None)
+            if proto not in (6, 17):
+                sport = dport = None
+            columns["timestamp"].append(round(ts * 1e6))
+            columns["packet"].append(self.rows)
+            columns["wire_length"].append(wirelen)
+            columns["captured_length"].append(len(frame))
+            columns["proto"].append(proto)
+            columns["src"].append(src and format_address(src))
+            columns["dst"].append(dst and format_address(dst))
+            columns["sport"].append(sport)
+            columns["dport"].append(dport)
+            self.rows += 1
+        if len(columns["packet"]) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        count = len(self.columns["packet"])
+        if not count:
+            return
+        arrays = []
+        for field in self.schema:
+            if field.name == "pcap":
+                arrays.append(pa.DictionaryArray.from_arrays(pa.array([0] * count, pa.int32()), [self.pcap_name]))
+            else:
+                arrays.append(pa.array(self.columns[field.name], field.type))
+        self.sink.write_batch(pa.record_batch(arrays, schema=self.schema))
+        for values in self.columns.values():
+            values.clear()
+
+    def close(self):
+        self.flush()
+        self.sink.close()
+
+
+# ========================================
+# Rotation + background writing
+# ========================================
+class CaptureRecorder:
+    """Engine recorder: writes every dispatched batch to rotating files in `directory`.
+
+    A new file is started once the current one reaches `max_bytes` or spans
+    `max_seconds` of packet time (so a replay rotates like the live capture
+    did); both are checked per batch. With `keep`, only the newest `keep`
+    files (and their summaries) written by this recorder are kept.
+    `summary` is None, "parquet" or "arrow". Like AsyncWriter, the queue is
+    bounded: if the disk can't keep up, the engine slows down and the
+    capture queue drops instead of memory growing.
+    """
+
+    def __init__(self, directory, prefix="capture", max_bytes=100 << 20, max_seconds=3600, keep=None,
+                 summary=None, snaplen=MAX_SNAPLEN, max_batches=64):
+        if summary and pa is None:
+            raise ImportError("pyarrow is required for Parquet/Arrow packet summaries")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.keep = keep
+        self.summary = summary
+        self.snaplen = snaplen
+        self.pcap = None
+        self.summary_file = None
+        self.opened_at = 0.0
+        self.written = deque()  # paths of finished and current files, oldest first
+        self.counters = {"files": 0, "packets": 0, "bytes": 0}
+        self.batches = queue.Queue(max_batches)
+        self.error = None
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+
+    def __call__(self, batch, linktype):
+        if self.error is not None:
+            raise self.error
+        self.batches.put((batch, linktype))
+
+    def drain(self):
+        while (item := self.batches.get()) is not None:
+            if self.error is None:
+                try:
+                    self.write(*item)
+                except Exception as e:  # e.g. disk full: surfaced to the engine on the next batch
+                    self.error = e
+
+    def write(self, batch, linktype):
+        first = batch[0][0]
+        if (self.pcap is None or self.pcap.size >= self.max_bytes
+                or (self.max_seconds and first - self.opened_at >= self.max_seconds)):
+            self.rotate(first, linktype)
+        size = self.pcap.size
+        self.pcap.write(batch)
+        if self.summary_file is not None:
+            self.summary_file.write(batch, linktype)
+        self.counters["packets"] += len(batch)
+        self.counters["bytes"] += self.pcap.size - size
+
+    def rotate(self, ts, linktype):
+        self.close_files()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(ts))
+        base = os.path.join(self.directory, f"{self.prefix}-{stamp}-{self.counters['files']:04d}")
+        self.pcap = PcapFile(base + ".pcap", linktype, self.snaplen)
+        paths = [self.pcap.path]
+        if self.summary:
+            self.summary_file = SummaryFile(f"{base}.{self.summary}", os.path.basename(self.pcap.path))
+            paths.append(self.summary_file.path)
+        self.written.append(paths)
+        self.opened_at = ts
+        self.counters["files"] += 1
+        while self.keep and len(self.written) > self.keep:
+            for path in self.written.popleft():
+                os.remove(path)
+
+    def close_files(self):
+        if self.pcap is not None:
+            self.pcap.close()
+            self.pcap = None
+        if self.summary_file is not None:
+            self.summary_file.close()
+            self.summary_file = None
+
+    def close(self):
+        """Writes what's queued and closes the current files; returns the counters."""
+        self.batches.put(None)
+        self.thread.join()
+        self.close_files()
+        if self.error is not None:
+            raise self.error
+        return dict(self.counters)
@@ -0,0 +1,61 @@
+# =====================
+# Benchmark: cleaning.clean_products + top_n vs the original analyze_data steps
+# Usage: python bench_cleaning.py [rows]
+# =====================
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cleaning import clean_products, top_n
+
+
+def make_archive(rows, seed=0):
+    # Same shape as amazon_products.csv: repeated names, comma prices, "N/A" gaps
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Laptop model {i} (16GB RAM, 512GB SSD)" for i in range(5000)] + ["N/A"])
+    prices = np.array([f"{p:,}" for p in range(15000, 200000, 10)] + ["N/A"])
+    ratings = np.array([f"{r / 10:.1f} out of 5 stars" for r in range(10, 51)] + ["N/A"])
+    return pd.DataFrame({
+        "Product Name": names[rng.integers(0, len(names), rows)],
+        "Price": prices[rng.integers(0, len(prices), rows)],
+        "Rating": ratings[rng.integers(0, len(ratings), rows)],
+        "Link": "https://www.amazon.in/dp/B000000000",
+    }).astype(object)
+
+
+def original(df):
+    df = df.copy()
+    df["Price"] = pd.to_numeric(df["Price"].str.replace(",", ""), errors="coerce")
+    df["Rating"] = df["Rating"].str.extract(r"([0-9.]+)").astype(float)
+    return df, df.sort_values(by="Price", ascending=False).head(10)
+
+
+def vectorized(df):
+    cleaned = clean_products(df)
+    return cleaned, top_n(cleaned, 10, "Price")
+
+
+def timed(label, fn, df):
+    start = time.perf_counter()
+    cleaned, top10 = fn(df)
+    elapsed = time.perf_counter() - start
+    memory = cleaned[["Product Name", "Price", "Rating"]].memory_usage(deep=True).sum() / 2 ** 20
+    print(f"{label:<12} {elapsed:7.3f} s  {memory:8.1f} MiB (name/price/rating)")
+    return cleaned, top10
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    df = make_archive(rows)
+    print(f"🧹 {rows:,} rows\n")
+
+    old, old_top = timed("original", original, df)
+    new, new_top = timed("vectorized", vectorized, df)
+
+    assert np.allclose(old["Price"], new["Price"], equal_nan=True)
+    assert np.allclose(old["Rating"], new["Rating"], equal_nan=True)
+    assert list(old_top["Price"]) == list(new_top["Price"])
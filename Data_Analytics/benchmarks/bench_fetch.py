@@ -0,0 +1,51 @@
+# =====================
+# Benchmark: pooled concurrent fetch vs the old one-request-per-page loop
+# Usage: python bench_fetch.py [pages] [latency_seconds]
+# =====================
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from fetcher import Fetcher, DEFAULT_HEADERS
+from stub_server import start_stub_server
+
+
+def sequential_loop(base_url, query, pages):
+    # Same shape as the old scrape_amazon loop, minus the 2-5 s sleep
+    fetched = 0
+    for page in range(1, pages + 1):
+        response = requests.get(base_url, headers=DEFAULT_HEADERS, params={"k": query, "page": page})
+        if response.status_code == 200:
+            fetched += 1
+    return fetched
+
+
+def pooled(base_url, query, pages, concurrency):
+    with Fetcher(concurrency=concurrency, rate=1000) as fetcher:
+        return sum(1 for _, html in fetcher.fetch_pages(base_url, query, pages) if html)
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    fetched = fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {fetched:>4} pages  {elapsed:7.2f} s  {fetched / elapsed:8.1f} pages/sec")
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    server, base_url = start_stub_server(latency=latency)
+    print(f"📡 Stub server at {base_url} ({latency * 1000:.0f} ms per page)\n")
+
+    timed("sequential requests.get", sequential_loop, base_url, "laptop", pages)
+    for concurrency in (4, 8, 16):
+        timed(f"pooled, {concurrency} in flight", pooled, base_url, "laptop", pages, concurrency)
+
+    print("\n(old loop also slept 2-5 s per page: ~"
+          f"{pages * 3.5:.0f} s extra for {pages} pages)")
+    server.shutdown()
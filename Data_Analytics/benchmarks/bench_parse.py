@@ -0,0 +1,40 @@
+# =====================
+# Benchmark: parse throughput per backend over the saved HTML fixtures
+# Usage: python bench_parse.py [repeats] [fixture.html ...]
+# =====================
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from parsers import PARSERS, parse_bs4
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "*.html")
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    paths = sys.argv[2:] or sorted(glob.glob(FIXTURES))
+
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    print(f"📄 {len(pages)} fixture(s), {sum(map(len, pages)) / 1024:.1f} KiB, x{repeats}\n")
+
+    expected = [parse_bs4(html) for html in pages]
+
+    for name, parse in PARSERS.items():
+        if [parse(html) for html in pages] != expected:
+            print(f"{name:<12} ⚠️ output differs from bs4, skipped")
+            continue
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for html in pages:
+                parse(html)
+        elapsed = time.perf_counter() - start
+
+        parsed = repeats * len(pages)
+        print(f"{name:<12} {parsed / elapsed:9.1f} pages/sec  {elapsed / parsed * 1000:7.3f} ms/page")
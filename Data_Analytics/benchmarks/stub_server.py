@@ -0,0 +1,55 @@
+# =====================
+# Local stand-in for amazon.in/s serving the canned result page
+# =====================
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "search_page.html")
+
+
+def make_handler(template, latency, fail_every):
+    counter = {"n": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pooled sessions can reuse sockets
+
+        def do_GET(self):
+            with lock:
+                counter["n"] += 1
+                n = counter["n"]
+            time.sleep(latency)
+
+            if fail_every and n % fail_every == 0:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            query = parse_qs(urlsplit(self.path).query)
+            page = query.get("page", ["1"])[0]
+            body = template.replace("__PAGE__", page).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_stub_server(latency=0.05, fail_every=0, fixture=FIXTURE):
+    """Starts the stand-in on a free localhost port; returns (server, base_url)."""
+    with open(fixture, encoding="utf-8") as f:
+        template = f.read()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(template, latency, fail_every))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/s"
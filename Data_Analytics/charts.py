@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+from matplotlib.figure import Figure
+
+
+# =====================
+# DRAWING (from pre-binned aggregates, never raw rows)
+# =====================
+def draw_price_histogram(fig, hist, top_items):
+    ax = fig.add_subplot()
+    ax.hist(hist.edges[:-1], bins=hist.edges, weights=hist.counts, alpha=0.7)
+    ax.set_title("Price Distribution of Amazon Products")
+    ax.set_xlabel("Price (INR)")
+    ax.set_ylabel("Frequency")
+
+
+def draw_top_products(fig, hist, top_items):
+    ax = fig.add_subplot()
+    labels = [str(name) if len(str(name)) <= 40 else str(name)[:39] + "…" for _, name in top_items]
+    ax.barh(labels, [price for price, _ in top_items])
+    ax.set_title(f"Top {len(top_items)} Expensive Products")
+    ax.set_xlabel("Price (INR)")
+
+
+CHARTS = {
+    "price_distribution": (draw_price_histogram, (8, 5)),
+    "top_expensive": (draw_top_products, (10, 6)),
+}
+
+
+# =====================
+# HEADLESS RENDERING
+# =====================
+def chart_data_hash(hist, top_items):
+    digest = hashlib.sha256()
+    digest.update(hist.edges.tobytes())
+    digest.update(hist.counts.tobytes())
+    digest.update(json.dumps([[float(price), str(name)] for price, name in top_items]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render_charts(hist, top_items, out_dir="charts", formats=("png",), force=False):
+    """Writes every chart to out_dir; returns the paths written.
+
+    Figures are drawn with the Agg canvas directly, so no display or GUI
+    backend is needed. If the plotted data hashes the same as last time and
+    the files are still there, nothing is re-rendered and [] is returned.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    digest = chart_data_hash(hist, top_items)
+    stamp_path = os.path.join(out_dir, ".data.sha256")
+    paths = [os.path.join(out_dir, f"{name}.{fmt}") for name in CHARTS for fmt in formats]
+
+    if not force and os.path.exists(stamp_path) and all(map(os.path.exists, paths)):
+        with open(stamp_path, encoding="utf-8") as f:
+            if f.read().strip() == digest:
+                return []
+
+    for name, (draw, figsize) in CHARTS.items():
+        fig = Figure(figsize=figsize)
+        draw(fig, hist, top_items)
+        fig.tight_layout()
+        for fmt in formats:
+            fig.savefig(os.path.join(out_dir, f"{name}.{fmt}"))
+
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        f.write(digest)
+    return paths
+
+
+def show_charts(hist, top_items):
+    import matplotlib.pyplot as plt
+
+    for draw, figsize in CHARTS.values():
+        fig = plt.figure(figsize=figsize)
+        draw(fig, hist, top_items)
+        plt.show()
@@ -0,0 +1,238 @@
+import glob
+import heapq
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from cleaning import clean_products
+from product_index import extract_asin
+
+# Fixed edges so histograms from any file can be added
+PRICE_BINS = np.linspace(0, 200000, 41)
+RATING_BINS = np.linspace(0, 5, 51)
+COLUMNS = ("Product Name", "Price", "Rating", "Link")
+
+
+def product_key(name, link):
+    return extract_asin(link) or name
+
+
+# =====================
+# MERGEABLE AGGREGATES
+# =====================
+class RunningStats:
+    """Count, mean, variance (Chan et al. parallel update), min and max."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = values[~np.isnan(values)].astype(np.float64)
+        if len(values):
+            other = RunningStats()
+            other.count = len(values)
+            other.mean = values.mean()
+            other.m2 = ((values - other.mean) ** 2).sum()
+            other.min = values.min()
+            other.max = values.max()
+            self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class Histogram:
+    """Fixed-bin counts plus under/overflow, so merging is element-wise addition."""
+
+    def __init__(self, edges=PRICE_BINS):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        self.counts += np.histogram(values, bins=self.edges)[0]
+        self.underflow += int((values < self.edges[0]).sum())
+        self.overflow += int((values > self.edges[-1]).sum())
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def quantile(self, q):
+        # Linear interpolation inside the bin holding the q-th value
+        total = self.counts.sum() + self.underflow + self.overflow
+        if total == 0:
+            return np.nan
+        target = q * total - self.underflow
+        if target <= 0:
+            return self.edges[0]
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, target))
+        if index >= len(self.counts):
+            return self.edges[-1]
+        before = cumulative[index - 1] if index else 0
+        fraction = (target - before) / self.counts[index]
+        return self.edges[index] + fraction * (self.edges[index + 1] - self.edges[index])
+
+
+class TopK:
+    """The k most expensive products seen so far, each product once at its highest price.
+
+    Products are keyed by ASIN (from Link), or by name when there's no
+    product link, so the same listing repeated across dumps counts once.
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        self.best = {}  # product key -> (price, name)
+
+    def update(self, df):
+        # Widen the partial selection until it holds k distinct products
+        n = 4 * self.k
+        while True:
+            top = df.nlargest(n, "Price")
+            links = top["Link"].tolist() if "Link" in top else [None] * len(top)
+            keys = [product_key(name, link) for name, link in zip(top["Product Name"].tolist(), links)]
+            for price, name, key in zip(top["Price"].tolist(), top["Product Name"].tolist(), keys):
+                self.push(key, price, name)
+            if len(top) < n or len(set(keys)) >= self.k:
+                break
+            n *= 2
+
+    def push(self, key, price, name):
+        if np.isnan(price):
+            return
+        current = self.best.get(key)
+        if current is None or price > current[0]:
+            self.best[key] = (price, name)
+        if len(self.best) > 2 * self.k:
+            self.best = dict(heapq.nlargest(self.k, self.best.items(), key=lambda item: item[1][0]))
+
+    def merge(self, other):
+        for key, (price, name) in other.best.items():
+            self.push(key, price, name)
+
+    def items(self):
+        return heapq.nlargest(self.k, self.best.values(), key=lambda item: item[0])
+
+
+class ProductAggregates:
+    def __init__(self, k=10, price_bins=PRICE_BINS):
+        self.rows = 0
+        self.price = RunningStats()
+        self.rating = RunningStats()
+        self.price_hist = Histogram(price_bins)
+        self.rating_hist = Histogram(RATING_BINS)
+        self.top = TopK(k)
+
+    def update(self, chunk):
+        cleaned = clean_products(chunk)
+        prices = cleaned["Price"].to_numpy()
+        ratings = cleaned["Rating"].to_numpy()
+        self.rows += len(cleaned)
+        self.price.update(prices)
+        self.rating.update(ratings)
+        self.price_hist.update(prices)
+        self.rating_hist.update(ratings)
+        self.top.update(cleaned)
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.price.merge(other.price)
+        self.rating.merge(other.rating)
+        self.price_hist.merge(other.price_hist)
+        self.rating_hist.merge(other.rating_hist)
+        self.top.merge(other.top)
+        return self
+
+    def describe(self):
+        """Like df.describe() for Price/Rating.
+
+        Quartiles are estimated from the histograms (to within one bin, clamped
+        to the exact min/max) and labelled "~"; the other rows are exact.
+        """
+        rows = {}
+        for column, stats, hist in (("Price", self.price, self.price_hist),
+                                    ("Rating", self.rating, self.rating_hist)):
+            if stats.count:
+                quartiles = [min(max(hist.quantile(q), stats.min), stats.max) for q in (0.25, 0.5, 0.75)]
+                rows[column] = [stats.count, stats.mean, stats.std, stats.min, *quartiles, stats.max]
+            else:
+                rows[column] = [0, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
+        return pd.DataFrame(rows, index=["count", "mean", "std", "min", "~25%", "~50%", "~75%", "max"])
+
+
+# =====================
+# FILE / ARCHIVE DRIVERS
+# =====================
+def aggregate_file(path, chunksize=100000, k=10, price_bins=PRICE_BINS):
+    aggregates = ProductAggregates(k, price_bins)
+    chunks = pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False,
+                         usecols=lambda column: column in COLUMNS)
+    for chunk in chunks:
+        aggregates.update(chunk)
+    return aggregates
+
+
+def aggregate_files(paths, workers=None, chunksize=100000, k=10, price_bins=PRICE_BINS):
+    """Aggregates every file on a process pool (workers=0 runs in-process)."""
+    work = partial(aggregate_file, chunksize=chunksize, k=k, price_bins=price_bins)
+    total = ProductAggregates(k, price_bins)
+
+    if workers == 0:
+        for path in paths:
+            total.merge(work(path))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for aggregates in pool.map(work, paths):
+            total.merge(aggregates)
+    return total
+
+
+if __name__ == "__main__":
+    # Usage: python chunked_analysis.py [--charts DIR] "dumps/*.csv" [more files/globs ...]
+    args = sys.argv[1:]
+    charts_dir = None
+    if args[:1] == ["--charts"]:
+        charts_dir, args = args[1], args[2:]
+
+    paths = sorted(path for pattern in args or ["amazon_products.csv"]
+                   for path in glob.glob(pattern))
+    aggregates = aggregate_files(paths)
+
+    print(f"\n📊 {aggregates.rows} rows from {len(paths)} file(s):")
+    print(aggregates.describe())
+
+    print("\n💰 Top 10 Expensive Products:")
+    for price, name in aggregates.top.items():
+        print(f"  ₹{price:>10,.0f}  {name}")
+
+    if charts_dir:
+        from charts import render_charts
+
+        written = render_charts(aggregates.price_hist, aggregates.top.items(), charts_dir)
+        print(f"\n🖼️ {len(written)} chart file(s) written to {charts_dir}" if written
+              else f"\n🖼️ Charts in {charts_dir} are up to date")
@@ -0,0 +1,48 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+RATING_RE = re.compile(r"([0-9.]+)")
+
+
+# =====================
+# VECTORIZED PARSING
+# =====================
+def parse_distinct(series, parse):
+    """Runs `parse` once per distinct value and broadcasts the result back.
+
+    Scrape archives repeat the same prices and "x out of 5 stars" strings
+    millions of times, so parsing the uniques is far cheaper than the rows.
+    """
+    codes, uniques = pd.factorize(series)
+    parsed = parse(pd.Series(uniques, dtype=object)).to_numpy(dtype="float32")
+    parsed = np.append(parsed, np.float32("nan"))  # code -1 (missing) -> NaN
+    return pd.Series(parsed[codes], index=series.index, name=series.name)
+
+
+def parse_price(values):
+    return pd.to_numeric(values.str.replace(",", "", regex=False), errors="coerce")
+
+
+def parse_rating(values):
+    return values.str.extract(RATING_RE, expand=False).astype(float)
+
+
+def clean_products(df):
+    """Returns a compact copy: float32 Price/Rating, categorical Product Name."""
+    cleaned = pd.DataFrame(index=df.index)
+    cleaned["Product Name"] = df["Product Name"].astype("category")
+    cleaned["Price"] = parse_distinct(df["Price"], parse_price)
+    cleaned["Rating"] = parse_distinct(df["Rating"], parse_rating)
+    if "Link" in df:
+        cleaned["Link"] = df["Link"]
+    return cleaned
+
+
+# =====================
+# PARTIAL SELECTION
+# =====================
+def top_n(df, n=10, column="Price"):
+    # nlargest does a partial selection instead of sorting every row
+    return df.nlargest(n, column)
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import CrawlMetrics
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-IN,en;q=0.9"
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# =====================
+# POLITENESS: TOKEN BUCKET
+# =====================
+class TokenBucket:
+    """Allows `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is free; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+# =====================
+# POOLED FETCHER
+# =====================
+class Fetcher:
+    """Fetches pages over one keep-alive session with `concurrency` pages in flight.
+
+    Every host gets its own token bucket, so `rate` is requests/sec per host
+    (this replaces the old random 2-5 s sleep between pages). With a
+    PageCache, cached pages are served without touching the network.
+    Connection errors, 429 and 5xx responses are retried `retries` times
+    with exponential backoff. Timings and counts go to `metrics`.
+    """
+
+    def __init__(self, concurrency=4, rate=1.0, burst=None, headers=None, timeout=15, cache=None,
+                 retries=2, backoff=0.5, metrics=None):
+        self.concurrency = concurrency
+        self.cache = cache
+        self.rate = rate
+        self.burst = burst or concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = metrics if metrics is not None else CrawlMetrics()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self.buckets_lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+    def fetch(self, url, params=None):
+        """Returns the page HTML, or None if the request failed."""
+        if self.cache is not None:
+            html = self.cache.get(url, params)
+            if html is not None:
+                self.metrics.count("cache_hits")
+                return html
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.metrics.count("retries")
+                with self.metrics.timed("backoff"):
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+
+            self.metrics.add_time("rate_limit_wait", self.bucket_for(url).acquire())
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                self.metrics.observe_fetch(time.perf_counter() - start, 0)
+                continue
+            self.metrics.observe_fetch(time.perf_counter() - start, len(response.content))
+
+            if response.status_code == 200:
+                if self.cache is not None:
+                    self.cache.put(url, params, response.text)
+                return response.text
+            if response.status_code not in RETRY_STATUSES:
+                return None
+
+        return None
+
+    def fetch_pages(self, base_url, search_query, pages, window=None, start_page=1):
+        """Yields (page, html) for pages start_page..pages in page order.
+
+        At most `window` pages are fetched ahead of the consumer, so a slow
+        consumer pauses the network instead of buffering every page.
+        """
+        window = window or self.concurrency * 2
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = deque()
+            for page in range(start_page, pages + 1):
+                params = {"k": search_query, "page": page}
+                pending.append((page, pool.submit(self.fetch, base_url, params)))
+                if len(pending) >= window:
+                    done_page, future = pending.popleft()
+                    yield done_page, future.result()
+            while pending:
+                done_page, future = pending.popleft()
+                yield done_page, future.result()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,108 @@
+import bisect
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# =====================
+# CRAWL METRICS
+# =====================
+class CrawlMetrics:
+    """Thread-safe counters, per-stage seconds and a fetch-latency histogram.
+
+    Stages: fetch (network), rate_limit_wait and backoff (sleeping), parse
+    and write. Stage time is summed across threads/processes, so it can
+    exceed the wall-clock elapsed time when work overlaps.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.counters = {"pages_ok": 0, "pages_failed": 0, "cache_hits": 0, "requests": 0,
+                         "retries": 0, "bytes_downloaded": 0, "products": 0}
+        self.stage_seconds = {"fetch": 0.0, "rate_limit_wait": 0.0, "backoff": 0.0,
+                              "parse": 0.0, "write": 0.0}
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last bucket is +Inf
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, stage, seconds):
+        with self.lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def observe_fetch(self, seconds, nbytes):
+        with self.lock:
+            self.counters["requests"] += 1
+            self.counters["bytes_downloaded"] += nbytes
+            self.stage_seconds["fetch"] += seconds
+            self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    # =====================
+    # REPORTING
+    # =====================
+    def summary(self):
+        with self.lock:
+            elapsed = time.perf_counter() - self.started
+            pages = self.counters["pages_ok"]
+            parse = self.stage_seconds["parse"]
+            return {
+                "elapsed_seconds": round(elapsed, 3),
+                "counters": dict(self.counters),
+                "stage_seconds": {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+                "fetch_latency_histogram": {  # cumulative, like Prometheus buckets
+                    f"le_{bound}": count
+                    for bound, count in zip(LATENCY_BUCKETS + ("inf",), itertools.accumulate(self.latency_counts))
+                },
+                "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+                "products_per_second": round(self.counters["products"] / elapsed, 2) if elapsed else 0.0,
+                "parse_ms_per_page": round(parse / pages * 1000, 3) if pages else 0.0,
+            }
+
+    def dump(self, path=None):
+        """Returns the summary as JSON, also writing it to `path` if given."""
+        text = json.dumps(self.summary(), indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, prefix="scraper"):
+        with self.lock:
+            lines = [f"# TYPE {prefix}_fetch_latency_seconds histogram"]
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.latency_counts):
+                cumulative += count
+                lines.append(f'{prefix}_fetch_latency_seconds_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{prefix}_fetch_latency_seconds_sum {self.stage_seconds['fetch']}")
+            lines.append(f"{prefix}_fetch_latency_seconds_count {self.counters['requests']}")
+
+            for name, value in self.counters.items():
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+
+            lines.append(f"# TYPE {prefix}_stage_seconds_total counter")
+            for stage, seconds in self.stage_seconds.items():
+                lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix="scraper"):
+        # Atomic replace, so a textfile collector never reads a half-written file
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
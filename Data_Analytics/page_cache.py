@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+
+# =====================
+# ON-DISK PAGE CACHE
+# =====================
+class PageCache:
+    """Stores fetched HTML under sha256(url + sorted params).
+
+    Each file starts with the time the page was fetched, and entries older
+    than `ttl` seconds (by that time) are treated as misses. Reads refresh an
+    entry's mtime, which only orders eviction: once the cache grows past
+    `max_bytes` the least recently used files are evicted.
+    """
+
+    def __init__(self, cache_dir=".page_cache", ttl=24 * 3600, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self.entries())
+
+    def entries(self):
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.endswith(".html")]
+
+    def path_for(self, url, params=None):
+        key = url + "?" + urlencode(sorted((params or {}).items()))
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".html")
+
+    def get(self, url, params=None):
+        path = self.path_for(url, params)
+        try:
+            with open(path, encoding="utf-8") as f:
+                fetched = f.readline()
+                html = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            expired = time.time() - float(fetched) > self.ttl
+        except ValueError:  # written before entries carried their fetch time
+            expired = True
+        if expired:
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass
+        return html
+
+    def put(self, url, params, html):
+        path = self.path_for(url, params)
+        data = f"{time.time()}\n{html}".encode("utf-8")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        with self.lock:
+            if os.path.exists(path):
+                self.total_bytes -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def remove(self, path):
+        with self.lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self.total_bytes -= size
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        # Caller holds self.lock; drop oldest-used entries down to 90% of the budget
+        by_age = sorted(self.entries(), key=os.path.getmtime)
+        for path in by_age:
+            if self.total_bytes <= self.max_bytes * 0.9:
+                break
+            self.total_bytes -= os.path.getsize(path)
+            os.remove(path)
+
+
+# =====================
+# CRAWL CHECKPOINT
+# =====================
+class Checkpoint:
+    """Remembers the last page written for a query so an interrupted crawl can resume."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def next_page(self, search_query):
+        state = self.load()
+        if state.get("query") != search_query:
+            return 1
+        return state.get("last_page", 0) + 1
+
+    def mark_done(self, search_query, page):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"query": search_query, "last_page": page}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,131 @@
+from bs4 import BeautifulSoup
+
+# Optional fast backends
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+AMAZON_ROOT = "https://www.amazon.in"
+
+
+def make_product(name, price, rating, href):
+    return {
+        "Product Name": name.strip() if name is not None else "N/A",
+        "Price": price.strip().replace(",", "") if price is not None else "N/A",
+        "Rating": rating.strip() if rating is not None else "N/A",
+        "Link": AMAZON_ROOT + href if href is not None else "N/A"
+    }
+
+
+# =====================
+# BACKEND: BeautifulSoup (reference implementation)
+# =====================
+def parse_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    products = []
+
+    for item in soup.select(".s-result-item"):
+        name = item.select_one("h2 span")
+        price = item.select_one(".a-price-whole")
+        rating = item.select_one("span.a-icon-alt")
+        link = item.select_one("a.a-link-normal")
+
+        products.append(make_product(
+            name.text if name else None,
+            price.text if price else None,
+            rating.text if rating else None,
+            link["href"] if link else None
+        ))
+
+    return products
+
+
+# =====================
+# BACKEND: lxml with precompiled XPath
+# =====================
+def has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml_html is not None:
+    LXML_ITEMS = etree.XPath(f"//*[{has_class('s-result-item')}]")
+    LXML_NAME = etree.XPath("(.//h2//span)[1]")
+    LXML_PRICE = etree.XPath(f"(.//*[{has_class('a-price-whole')}])[1]")
+    LXML_RATING = etree.XPath(f"(.//span[{has_class('a-icon-alt')}])[1]")
+    LXML_LINK = etree.XPath(f"(.//a[{has_class('a-link-normal')}])[1]/@href")
+
+
+def first_text(xpath, node):
+    found = xpath(node)
+    return found[0].text_content() if found else None
+
+
+def parse_lxml(html):
+    tree = lxml_html.fromstring(html)
+    products = []
+
+    for item in LXML_ITEMS(tree):
+        href = LXML_LINK(item)
+        products.append(make_product(
+            first_text(LXML_NAME, item),
+            first_text(LXML_PRICE, item),
+            first_text(LXML_RATING, item),
+            str(href[0]) if href else None
+        ))
+
+    return products
+
+
+# =====================
+# BACKEND: selectolax (lexbor CSS engine)
+# =====================
+def parse_selectolax(html):
+    tree = LexborHTMLParser(html)
+    products = []
+
+    for item in tree.css(".s-result-item"):
+        name = item.css_first("h2 span")
+        price = item.css_first(".a-price-whole")
+        rating = item.css_first("span.a-icon-alt")
+        link = item.css_first("a.a-link-normal")
+
+        products.append(make_product(
+            name.text() if name else None,
+            price.text() if price else None,
+            rating.text() if rating else None,
+            link.attributes.get("href") if link else None
+        ))
+
+    return products
+
+
+# =====================
+# BACKEND REGISTRY
+# =====================
+PARSERS = {"bs4": parse_bs4}
+if lxml_html is not None:
+    PARSERS["lxml"] = parse_lxml
+if LexborHTMLParser is not None:
+    PARSERS["selectolax"] = parse_selectolax
+
+# Fastest first, per benchmarks/bench_parse.py
+PREFERRED = ["selectolax", "lxml", "bs4"]
+
+
+def get_parser(name="auto"):
+    """Returns a parse(html) -> list of product dicts function."""
+    if name == "auto":
+        name = next(n for n in PREFERRED if n in PARSERS)
+    if name not in PARSERS:
+        raise ValueError(f"Unknown or unavailable parser backend: {name} (have {', '.join(PARSERS)})")
+    return PARSERS[name]
+
+
+def parse_page(html, backend="auto"):
+    return get_parser(backend)(html)
@@ -0,0 +1,61 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from parsers import parse_page
+
+
+def timed_parse(html, parser):
+    # Runs in the worker, so the time excludes queueing and pickling
+    start = time.perf_counter()
+    products = parse_page(html, parser)
+    return products, time.perf_counter() - start
+
+
+# =====================
+# FETCH -> PARSE PIPELINE
+# =====================
+def crawl(fetcher, base_url, search_query, pages, parser="auto", workers=None, max_pending=None,
+          start_page=1):
+    """Yields (page, products) in page order; products is None for failed pages.
+
+    Fetched HTML goes to a pool of `workers` parser processes (0 parses in
+    this process). At most `max_pending` pages wait on the parsers; once
+    that queue is full we stop pulling from the fetcher, which in turn stops
+    fetching ahead, so fast networks can't outrun slow parsers. Parse time
+    and page counts go to fetcher.metrics.
+    """
+    metrics = fetcher.metrics
+
+    def finish(page, result):
+        if result is None:
+            metrics.count("pages_failed")
+            return page, None
+        products, seconds = result
+        metrics.add_time("parse", seconds)
+        metrics.count("pages_ok")
+        return page, products
+
+    workers = os.cpu_count() if workers is None else workers
+    max_pending = max_pending or max(workers, 1) * 2
+
+    if workers == 0:
+        for page, html in fetcher.fetch_pages(base_url, search_query, pages, start_page=start_page):
+            yield finish(page, timed_parse(html, parser) if html is not None else None)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        for page, html in fetcher.fetch_pages(base_url, search_query, pages, start_page=start_page):
+            future = pool.submit(timed_parse, html, parser) if html is not None else None
+            pending.append((page, future))
+
+            if len(pending) >= max_pending:
+                done_page, future = pending.popleft()
+                yield finish(done_page, future.result() if future else None)
+
+        while pending:
+            done_page, future = pending.popleft()
+            yield finish(done_page, future.result() if future else None)
@@ -0,0 +1,124 @@
+import re
+import sqlite3
+import time
+from urllib.parse import unquote
+
+AMAZON_ROOT = "https://www.amazon.in"
+ASIN_RE = re.compile(r"/dp/([A-Z0-9]{10})")
+
+
+# =====================
+# LINK HELPERS
+# =====================
+def clean_link(raw_link):
+    if "/dp/" in raw_link:  # drop tracking params from product links
+        return AMAZON_ROOT + raw_link.split("?")[0]
+    return AMAZON_ROOT + raw_link
+
+
+def extract_asin(link):
+    """ASIN from a /dp/ link (also inside URL-encoded sponsored redirects), else None."""
+    match = ASIN_RE.search(unquote(link or ""))
+    return match.group(1) if match else None
+
+
+# =====================
+# PRODUCT INDEX
+# =====================
+class ProductIndex:
+    """Drops repeated products at ingest time and records what changed per run.
+
+    Products seen in the current run are kept in a set; the SQLite tables keep
+    the latest row per ASIN across runs plus a `changes` log, so a run's diff
+    (new products, price changes) is read straight from the log instead of
+    comparing whole crawls.
+    """
+
+    def __init__(self, path="products.db"):
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS products (
+                asin TEXT PRIMARY KEY,
+                name TEXT, price TEXT, rating TEXT, link TEXT,
+                first_run INTEGER, last_run INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS changes (
+                run INTEGER NOT NULL,
+                asin TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                old_price TEXT, new_price TEXT
+            );
+            CREATE INDEX IF NOT EXISTS changes_by_run ON changes (run);
+        """)
+        self.run = None
+        self.seen = set()
+
+    def start_run(self, resume=False):
+        """Starts a new run, or with resume=True continues the latest one."""
+        latest = self.db.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+        if resume and latest is not None:
+            self.run = latest
+            self.seen = {asin for (asin,) in self.db.execute(
+                "SELECT asin FROM products WHERE last_run = ?", (latest,))}
+        else:
+            with self.db:
+                self.run = self.db.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),)).lastrowid
+            self.seen = set()
+        return self.run
+
+    def ingest(self, rows):
+        """Returns only the rows not seen before in this run (and with an ASIN)."""
+        if self.run is None:
+            self.start_run()
+
+        fresh = {}
+        for row in rows:
+            asin = extract_asin(row.get("Link"))
+            if asin and asin not in self.seen and asin not in fresh:
+                fresh[asin] = row
+        if not fresh:
+            return []
+
+        placeholders = ",".join("?" * len(fresh))
+        known = dict(self.db.execute(
+            f"SELECT asin, price FROM products WHERE asin IN ({placeholders})", list(fresh)))
+
+        changes = []
+        for asin, row in fresh.items():
+            if asin not in known:
+                changes.append((self.run, asin, "new", None, row["Price"]))
+            elif known[asin] != row["Price"]:
+                changes.append((self.run, asin, "price", known[asin], row["Price"]))
+
+        with self.db:
+            self.db.executemany("""
+                INSERT INTO products (asin, name, price, rating, link, first_run, last_run)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (asin) DO UPDATE SET
+                    name = excluded.name, price = excluded.price, rating = excluded.rating,
+                    link = excluded.link, last_run = excluded.last_run
+            """, [(asin, row["Product Name"], row["Price"], row["Rating"], row["Link"], self.run, self.run)
+                  for asin, row in fresh.items()])
+            self.db.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?)", changes)
+
+        self.seen.update(fresh)
+        return list(fresh.values())
+
+    def diff(self, run=None):
+        """(asin, kind, old_price, new_price) for every new product / price change in a run."""
+        return self.db.execute(
+            "SELECT asin, kind, old_price, new_price FROM changes WHERE run = ?",
+            (run or self.run,)).fetchall()
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
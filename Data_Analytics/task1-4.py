@@ -1,55 +1,60 @@
-import requests
-from bs4 import BeautifulSoup
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from charts import render_charts, show_charts
+from chunked_analysis import Histogram
+from cleaning import clean_products, top_n
+from fetcher import Fetcher
+from metrics import CrawlMetrics
+from page_cache import Checkpoint, PageCache
+from pipeline import crawl
+from product_index import ProductIndex
+from writers import open_writer
 
 # =====================
 # TASK 2: SCRAPING DATA
 # =====================
-def scrape_amazon(search_query, pages=3):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                      "Chrome/120.0.0.0 Safari/537.36"
-    }
-
-    base_url = "https://www.amazon.in/s"
+def scrape_amazon(search_query, pages=3, concurrency=4, rate=1.0,
+                  base_url="https://www.amazon.in/s", parser="auto", workers=None,
+                  writer=None, cache=None, checkpoint=None, index=None, metrics=None):
+    # With a writer, rows are flushed page by page instead of kept in memory.
+    # With a checkpoint, the crawl resumes after the last page it wrote.
+    # With a ProductIndex, repeats and empty result slots are dropped by ASIN.
+    # Pass a CrawlMetrics to read per-stage timings after the run.
     products = []
-
-    for page in range(1, pages + 1):
-        params = {"k": search_query, "page": page}
-        response = requests.get(base_url, headers=headers, params=params)
-
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch page {page}")
-            continue
-
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        for item in soup.select(".s-result-item"):
-            # Product Name
-            name = item.select_one("h2 span")
-            name = name.text.strip() if name else "N/A"
-
-            # Price
-            price = item.select_one(".a-price-whole")
-            price = price.text.strip().replace(",", "") if price else "N/A"
-
-            # Rating
-            rating = item.select_one("span.a-icon-alt")
-            rating = rating.text.strip() if rating else "N/A"
-
-            # Link
-            link = item.select_one("a.a-link-normal")
-            link = "https://www.amazon.in" + link["href"] if link else "N/A"
-
-            products.append({
-                "Product Name": name,
-                "Price": price,
-                "Rating": rating,
-                "Link": link
-            })
-
+    failed = False
+    start_page = checkpoint.next_page(search_query) if checkpoint else 1
+    if start_page > 1:
+        print(f"↩️ Resuming '{search_query}' at page {start_page}")
+
+    # Pages are parsed on `workers` processes while the next ones download
+    with Fetcher(concurrency=concurrency, rate=rate, cache=cache, metrics=metrics) as fetcher:
+        for page, page_products in crawl(fetcher, base_url, search_query, pages,
+                                         parser=parser, workers=workers, start_page=start_page):
+            if page_products is None:
+                print(f"❌ Failed to fetch page {page}")
+                page_products = []
+                failed = True
+            elif index is not None:
+                page_products = index.ingest(page_products)
+
+            fetcher.metrics.count("products", len(page_products))
+            if writer is not None:
+                with fetcher.metrics.timed("write"):
+                    writer.write_rows(page_products)
+            else:
+                products.extend(page_products)
+
+            # Only advance past pages that were fetched and written, so a resumed
+            # crawl retries the first failed page (later ones come from the cache
+            # and the index drops their repeats)
+            if checkpoint and not failed:
+                checkpoint.mark_done(search_query, page)
+
+    if checkpoint and not failed:
+        checkpoint.clear()
+    elif checkpoint:
+        print(f"↩️ Re-run to retry '{search_query}' from page {checkpoint.next_page(search_query)}")
     return products
 
 
@@ -57,40 +62,35 @@ def scrape_amazon(search_query, pages=3):
 # TASK 3: SAVE TO CSV
 # =====================
 def save_to_csv(products, filename="amazon_products.csv"):
-    df = pd.DataFrame(products)
-    df.to_csv(filename, index=False, encoding="utf-8")
+    with open_writer(filename) as writer:
+        writer.write_rows(products)
     print(f"✅ Data saved to {filename}")
-    return df
+    return pd.DataFrame(products)
 
 
 # =====================
 # TASK 4: ANALYSIS + VISUALIZATION
 # =====================
-def analyze_data(df):
-    # Convert price to numeric
-    df["Price"] = pd.to_numeric(df["Price"].str.replace(",", ""), errors="coerce")
-
-    # Extract numeric rating (first number before "out of 5")
-    df["Rating"] = df["Rating"].str.extract(r"([0-9.]+)").astype(float)
+def analyze_data(df, out_dir=None, formats=("png",)):
+    # Numeric Price/Rating ("4.1 out of 5 stars" -> 4.1) in compact dtypes
+    df = clean_products(df)
 
     print("\n📊 Dataset Summary:")
     print(df.describe(include="all"))
 
-    # Plot price distribution
-    plt.figure(figsize=(8, 5))
-    df["Price"].dropna().plot(kind="hist", bins=20, alpha=0.7)
-    plt.title("Price Distribution of Amazon Products")
-    plt.xlabel("Price (INR)")
-    plt.ylabel("Frequency")
-    plt.show()
+    # Charts are drawn from binned prices and the top 10, not from every row
+    prices = df["Price"].to_numpy()
+    price_hist = Histogram(np.histogram_bin_edges(prices[~np.isnan(prices)], bins=20))
+    price_hist.update(prices)
+    top10 = top_n(df, 10, "Price")
+    top_items = list(zip(top10["Price"].tolist(), top10["Product Name"].tolist()))
 
-    # Top 10 expensive products
-    top10 = df.sort_values(by="Price", ascending=False).head(10)
-    plt.figure(figsize=(10, 6))
-    plt.barh(top10["Product Name"], top10["Price"])
-    plt.title("Top 10 Expensive Products")
-    plt.xlabel("Price (INR)")
-    plt.show()
+    if out_dir is None:
+        show_charts(price_hist, top_items)
+    elif render_charts(price_hist, top_items, out_dir, formats):
+        print(f"🖼️ Charts saved to {out_dir}")
+    else:
+        print(f"🖼️ Charts in {out_dir} are up to date")
 
 
 # =====================
@@ -98,6 +98,25 @@ def analyze_data(df):
 # =====================
 if __name__ == "__main__":
     query = "laptop"   # Change this to search anything
-    data = scrape_amazon(query, pages=3)
-    df = save_to_csv(data, "amazon_products.csv")
+    cache = PageCache(".page_cache")  # re-runs within a day skip the network
+    checkpoint = Checkpoint("amazon_products.checkpoint.json")
+    resuming = checkpoint.next_page(query) > 1
+    metrics = CrawlMetrics()
+
+    with ProductIndex("products.db") as index, \
+            open_writer("amazon_products.csv", append=resuming) as writer:
+        index.start_run(resume=resuming)
+        scrape_amazon(query, pages=3, writer=writer, cache=cache, checkpoint=checkpoint, index=index,
+                      metrics=metrics)
+        changes = index.diff()
+    print(f"✅ {writer.rows_written} rows saved to amazon_products.csv")
+
+    new = sum(1 for change in changes if change[1] == "new")
+    print(f"🆕 {new} new products, 💸 {len(changes) - new} price changes since the last run")
+
+    print("\n⏱️ Crawl metrics:")
+    print(metrics.dump("crawl_metrics.json"))
+    metrics.write_prometheus("crawl_metrics.prom")
+
+    df = pd.read_csv("amazon_products.csv", dtype=str, keep_default_na=False)
     analyze_data(df)
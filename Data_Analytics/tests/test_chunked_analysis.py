@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from chunked_analysis import ProductAggregates, TopK
+
+
+def dump(rows):
+    return pd.DataFrame(rows, columns=["Product Name", "Price", "Link"]).astype({"Price": np.float32})
+
+
+def test_top_k_lists_each_product_once_across_dumps():
+    monday = dump([("Laptop A", 90000, "https://www.amazon.in/A/dp/B000000001/ref=sr_1_1"),
+                   ("Laptop B", 80000, "https://www.amazon.in/B/dp/B000000002/ref=sr_1_2"),
+                   ("Laptop C", 10000, "N/A")])
+    tuesday = dump([("Laptop A", 95000, "https://www.amazon.in/A/dp/B000000001/ref=sr_1_9"),
+                    ("Laptop B", 70000, "https://www.amazon.in/B/dp/B000000002/ref=sr_1_4"),
+                    ("Laptop C", 12000, "N/A")])
+    first, second = TopK(3), TopK(3)
+    first.update(monday)
+    second.update(tuesday)
+    first.merge(second)
+    assert first.items() == [(95000, "Laptop A"), (80000, "Laptop B"), (12000, "Laptop C")]
+
+
+def test_top_k_looks_past_repeats_within_a_chunk():
+    rows = [("Laptop A", 90000 - n, "https://www.amazon.in/A/dp/B000000001") for n in range(50)]
+    rows.append(("Laptop B", 1000, "https://www.amazon.in/B/dp/B000000002"))
+    top = TopK(2)
+    top.update(dump(rows))
+    assert top.items() == [(90000, "Laptop A"), (1000, "Laptop B")]
+
+
+def test_estimated_quartiles_stay_within_min_and_max():
+    aggregates = ProductAggregates()
+    aggregates.update(pd.DataFrame({"Product Name": ["a", "b", "c", "d"],
+                                    "Price": ["1,000", "1,200", "1,300", "1,400"],
+                                    "Rating": ["3.9 out of 5 stars", "4.0 out of 5 stars",
+                                               "4.0 out of 5 stars", "4.0 out of 5 stars"]}))
+    described = aggregates.describe()
+    for column in ("Price", "Rating"):
+        quartiles = described.loc[["~25%", "~50%", "~75%"], column]
+        assert (quartiles >= described.loc["min", column]).all()
+        assert (quartiles <= described.loc["max", column]).all()
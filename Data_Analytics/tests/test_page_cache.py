@@ -0,0 +1,20 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from page_cache import PageCache
+
+
+def test_reads_do_not_extend_ttl(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=1)
+    cache.put("https://example.com/s", {"k": "laptop"}, "<html>page</html>")
+    assert cache.get("https://example.com/s", {"k": "laptop"}) == "<html>page</html>"
+
+    # Read more often than the TTL: each read refreshes LRU order, not the fetch time
+    deadline = time.time() + 1.5
+    while time.time() < deadline:
+        cache.get("https://example.com/s", {"k": "laptop"})
+        time.sleep(0.3)
+    assert cache.get("https://example.com/s", {"k": "laptop"}) is None
+    assert cache.total_bytes == 0
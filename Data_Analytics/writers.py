@@ -0,0 +1,117 @@
+import csv
+import os
+
+# Optional columnar output
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+COLUMNS = ["Product Name", "Price", "Rating", "Link"]
+
+
+# =====================
+# CSV: one flush per page
+# =====================
+class CsvWriter:
+    def __init__(self, filename, append=False, columns=COLUMNS):
+        has_header = append and os.path.exists(filename) and os.path.getsize(filename) > 0
+        self.file = open(filename, "a" if append else "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=columns)
+        self.rows_written = 0
+        if not has_header:
+            self.writer.writeheader()
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+        self.rows_written += len(rows)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =====================
+# COLUMNAR: rows are buffered into fixed-size row groups / record batches
+# =====================
+class ArrowBatchWriter:
+    """Base for Parquet/Arrow output; holds at most `row_group_size` rows in memory."""
+
+    def __init__(self, filename, row_group_size=10000, columns=COLUMNS):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet/Arrow output")
+        self.filename = filename
+        self.row_group_size = row_group_size
+        self.columns = columns
+        self.schema = pa.schema([(column, pa.string()) for column in columns])
+        self.buffer = []
+        self.rows_written = 0
+
+    def write_rows(self, rows):
+        self.buffer.extend(rows)
+        while len(self.buffer) >= self.row_group_size:
+            self.flush_batch(self.buffer[:self.row_group_size])
+            del self.buffer[:self.row_group_size]
+
+    def flush_batch(self, rows):
+        batch = pa.record_batch(
+            [[row.get(column) for row in rows] for column in self.columns],
+            schema=self.schema
+        )
+        self.write_batch(batch)
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self.buffer:
+            self.flush_batch(self.buffer)
+            self.buffer = []
+        self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetWriter(ArrowBatchWriter):
+    def __init__(self, filename, row_group_size=10000, columns=COLUMNS):
+        super().__init__(filename, row_group_size, columns)
+        self.sink = pq.ParquetWriter(filename, self.schema)
+
+    def write_batch(self, batch):
+        self.sink.write_batch(batch, row_group_size=self.row_group_size)
+
+
+class ArrowWriter(ArrowBatchWriter):
+    def __init__(self, filename, row_group_size=10000, columns=COLUMNS):
+        super().__init__(filename, row_group_size, columns)
+        self.sink = pa.ipc.new_file(filename, self.schema)
+
+    def write_batch(self, batch):
+        self.sink.write_batch(batch)
+
+
+# =====================
+# PICK A WRITER BY FILE EXTENSION
+# =====================
+def open_writer(filename, append=False, **kwargs):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".parquet":
+        writer_class = ParquetWriter
+    elif extension in (".arrow", ".feather"):
+        writer_class = ArrowWriter
+    else:
+        return CsvWriter(filename, append=append, **kwargs)
+
+    if append:
+        raise ValueError(f"Appending is only supported for CSV output, not {extension}")
+    return writer_class(filename, **kwargs)
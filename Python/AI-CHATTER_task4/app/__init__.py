@@ -2,6 +2,9 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask import session
 from dotenv import load_dotenv
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 import os
 
 load_dotenv()
@@ -11,12 +14,74 @@ db = SQLAlchemy()
 def create_app():
     app = Flask(__name__)
     app.secret_key = os.getenv("SECRET_KEY")
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL", 'sqlite:///users.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 
     db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", sqlite_pragmas)
 
     from .routes import main
     app.register_blueprint(main)
 
+    from .history import history_store
+    history_store.start_purger(app)
+
+    # One-shot schema setup: `flask --app wsgi init-db`, run once before starting workers
+    @app.cli.command("init-db")
+    def init_db_command():
+        init_db(app)
+        print("✅ Database tables created")
+
+    @app.cli.command("purge-chats")
+    def purge_chats_command():
+        from .history import history_store
+        deleted = history_store.purge()
+        print(f"🧹 Deleted {deleted} chat turns older than {history_store.max_age.days} days")
+
     return app
+
+
+def engine_options(database_url):
+    url = make_url(database_url)
+    # In-memory SQLite keeps a single connection (no QueuePool), which takes no pool sizing
+    if not issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        return {}
+    return {
+        # One connection per request thread (see GUNICORN_THREADS) plus headroom
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 20)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
+
+
+def sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: readers don't block the writer (or each other) across worker processes
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def init_db(app):
+    from .models import ChatTurn, Users
+
+    with app.app_context():
+        db.create_all()
+        # create_all skips tables that already exist, indexes included. Tables made
+        # before the named indexes existed declared UNIQUE (username) / UNIQUE (email)
+        # instead, which already index those columns, so don't add a second one.
+        inspector = inspect(db.engine)
+        unique = {tuple(index["column_names"]) for index in inspector.get_indexes(Users.__tablename__)
+                  if index["unique"]}
+        unique |= {tuple(constraint["column_names"])
+                   for constraint in inspector.get_unique_constraints(Users.__tablename__)}
+        for index in Users.__table__.indexes:
+            if tuple(column.name for column in index.columns) not in unique:
+                index.create(db.engine, checkfirst=True)
+        # Likewise for chat_turn tables made before `created` was indexed
+        for index in ChatTurn.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
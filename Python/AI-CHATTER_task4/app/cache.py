@@ -0,0 +1,168 @@
+from collections import OrderedDict
+from .gemini import SYSTEM_PROMPT
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+# ========= KEYS =========
+
+def normalize(text):
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(history, user_message, summary=None):
+    """sha256 of the conversation sent to Gemini, with whitespace/case normalized."""
+    normalized = [
+        normalize(SYSTEM_PROMPT),
+        normalize(summary or ""),
+        [[normalize(turn["user"]), normalize(turn["bot"])] for turn in history],
+        normalize(user_message),
+    ]
+    payload = json.dumps(normalized, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ========= BACKENDS =========
+
+class ResponseCache:
+    """Base class: hit/miss counters (per process) around a get/put backend."""
+
+    def __init__(self):
+        self.counter_lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stores": 0}
+
+    def count(self, name):
+        with self.counter_lock:
+            self.counters[name] += 1
+
+    def get(self, key):
+        value = self.lookup(key)
+        self.count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value):
+        self.store(key, value)
+        self.count("stores")
+
+    def stats(self):
+        with self.counter_lock:
+            stats = dict(self.counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["backend"] = type(self).__name__
+        return stats
+
+
+class NullCache(ResponseCache):
+    """Caching disabled."""
+
+    def lookup(self, key):
+        return None
+
+    def store(self, key, value):
+        pass
+
+
+class MemoryCache(ResponseCache):
+    """In-process LRU with TTL."""
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def lookup(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def store(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.time() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class SqliteCache(ResponseCache):
+    """SQLite-backed LRU with TTL, shared by every worker process on the host."""
+
+    def __init__(self, path, max_entries=10000, ttl=3600):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.local = threading.local()
+        with self.connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS response_cache_lru ON response_cache (last_used)")
+
+    def connect(self):
+        # sqlite3 connections can't be shared across threads; keep one per thread
+        if not hasattr(self.local, "db"):
+            self.local.db = sqlite3.connect(self.path, timeout=5)
+            self.local.db.execute("PRAGMA journal_mode=WAL")
+        return self.local.db
+
+    def lookup(self, key):
+        db = self.connect()
+        now = time.time()
+        row = db.execute("SELECT value, expires FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with db:
+            if row[1] < now:
+                db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def store(self, key, value):
+        db = self.connect()
+        now = time.time()
+        with db:
+            db.execute("INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                       (key, value, now + self.ttl, now))
+            db.execute("""
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+
+def make_cache(spec, max_entries=1024, ttl=3600):
+    """'' -> disabled, 'memory' -> in-process, 'sqlite:///path.db' -> shared SQLite."""
+    if not spec:
+        return NullCache()
+    if spec == "memory":
+        return MemoryCache(max_entries, ttl)
+    if spec.startswith("sqlite:///"):
+        return SqliteCache(spec[len("sqlite:///"):], max_entries, ttl)
+    raise ValueError(f"Unknown RESPONSE_CACHE backend: {spec}")
+
+
+response_cache = make_cache(
+    os.getenv("RESPONSE_CACHE", ""),
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", 3600))
+)
@@ -0,0 +1,100 @@
+from .gemini import encode_json, generate
+from .models import ChatSummary
+from . import db
+from sqlalchemy.exc import IntegrityError
+import os
+import requests
+
+SUMMARY_PROMPT = """Update the running summary of a chat between a user and AI-CHATTER.
+Keep names, facts, preferences and open questions; drop small talk. Reply with the summary only, under {words} words.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+"""
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English text, plus a little per-message overhead
+    return len(text) // 4 + 4
+
+
+def turn_tokens(turn):
+    return estimate_tokens(turn["user"]) + estimate_tokens(turn["bot"])
+
+
+class ContextBuilder:
+    """Keeps the history sent upstream within `token_budget` tokens.
+
+    The newest turns are sent verbatim while they fit; older turns are folded
+    into a rolling summary (one summarization call, stored in ChatSummary) and
+    never resent. When a fold is needed, the verbatim window shrinks to half the
+    budget and half the turns, so the next few messages don't each trigger
+    another fold.
+    """
+
+    def __init__(self, token_budget=2000, max_recent_turns=19, summary_words=150):
+        self.token_budget = token_budget
+        self.max_recent_turns = max_recent_turns
+        self.summary_words = summary_words
+
+    def recent_window(self, turns, budget, max_turns):
+        window, used = [], 0
+        for turn in reversed(turns):
+            used += turn_tokens(turn)
+            if used > budget or len(window) == max_turns:
+                break
+            window.append(turn)
+        return window[::-1]
+
+    def build(self, chat_id, history):
+        """Returns (summary text or None, recent turns to send verbatim)."""
+        saved = db.session.get(ChatSummary, chat_id) if chat_id else None
+        summary = saved.text if saved else None
+        through_id = saved.through_id if saved else 0
+
+        unsummarized = [turn for turn in history if turn["id"] > through_id]
+        recent = self.recent_window(unsummarized, self.token_budget, self.max_recent_turns)
+        if len(recent) == len(unsummarized):
+            return summary, recent
+
+        recent = self.recent_window(unsummarized, self.token_budget // 2, max(1, self.max_recent_turns // 2))
+        overflow = unsummarized[:len(unsummarized) - len(recent)]
+        try:
+            summary = self.fold(chat_id, saved, summary, overflow)
+        except requests.exceptions.RequestException:
+            pass  # keep the old summary; the overflow is retried on the next message
+        return summary, recent
+
+    def fold(self, chat_id, saved, summary, turns):
+        prompt = SUMMARY_PROMPT.format(
+            words=self.summary_words,
+            summary=summary or "(none yet)",
+            turns="\n".join(f"User: {turn['user']}\nAI-CHATTER: {turn['bot']}" for turn in turns)
+        )
+        text = generate(encode_json({"contents": [{"role": "user", "parts": [{"text": prompt}]}]}))
+        if not text:
+            return summary
+        text = text[:self.summary_words * 8]  # hard cap in case the model ignores the word limit
+
+        through_id = turns[-1]["id"]
+        if saved is None:
+            db.session.add(ChatSummary(chat_id=chat_id, text=text, through_id=through_id))
+            try:
+                db.session.commit()
+                return text
+            except IntegrityError:  # a concurrent request for this chat saved its fold first
+                db.session.rollback()
+        # Only ever move the summary forward: a concurrent fold may already cover more turns
+        (ChatSummary.query.filter(ChatSummary.chat_id == chat_id, ChatSummary.through_id < through_id)
+         .update({"text": text, "through_id": through_id}, synchronize_session=False))
+        db.session.commit()
+        return text
+
+
+context_builder = ContextBuilder(
+    token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", 2000)),
+    max_recent_turns=int(os.getenv("HISTORY_TURNS", 20)) - 1
+)
@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+import json
+import os
+import random
+import requests
+import threading
+import time
+
+# ========= CONFIG =========
+load_dotenv()
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+if not GEMINI_API_KEY:
+    raise RuntimeError("❌ Missing GEMINI_API_KEY in environment variables")
+
+GEMINI_MODEL = "gemini-2.0-flash"
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+GEMINI_URL = f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:generateContent"
+GEMINI_STREAM_URL = f"{GEMINI_API_BASE}/models/{GEMINI_MODEL}:streamGenerateContent"
+
+SYSTEM_PROMPT = """You are AI-CHATTER — a friendly, concise AI assistant for helping people and casual conversation.
+Goals:
+- Be clear, safe, and helpful.
+- Answer directly first, then add brief extra tips if useful.
+- If the user seems uncertain, ask one short follow-up question.
+- Avoid overlong answers; prefer simple language.
+- If you don’t know something, say so.
+"""
+
+FALLBACK_REPLY = "⚠️ Sorry, I couldn’t generate a response. Please try again."
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# ========= SHARED OUTBOUND CLIENT =========
+
+class UpstreamBusy(requests.exceptions.RequestException):
+    """Raised when every upstream slot stays taken for `queue_timeout` seconds."""
+
+
+class GeminiClient:
+    """One keep-alive connection pool shared by every request thread.
+
+    At most `max_in_flight` calls run at once; each call has connect/read
+    timeouts, and connection errors / 429 / 5xx are retried with full-jitter
+    exponential backoff. Retries happen before a response is handed back,
+    so a stream is never retried halfway through.
+    """
+
+    def __init__(self, max_in_flight=64, pool_size=None, connect_timeout=3.05, read_timeout=60,
+                 retries=2, backoff=0.5, queue_timeout=10):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size or max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+
+    @contextmanager
+    def slot(self):
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise UpstreamBusy("Too many chats in flight, please try again")
+        try:
+            yield
+        finally:
+            self.slots.release()
+
+    def post(self, url, **kwargs):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            try:
+                response = self.session.post(url, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.retries:
+                    raise
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                return response
+            response.close()
+
+
+client = GeminiClient(
+    max_in_flight=int(os.getenv("GEMINI_MAX_IN_FLIGHT", 64)),
+    connect_timeout=float(os.getenv("GEMINI_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.getenv("GEMINI_READ_TIMEOUT", 60)),
+    retries=int(os.getenv("GEMINI_RETRIES", 2))
+)
+
+
+# ========= REQUEST / RESPONSE HELPERS =========
+
+def encode_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_part(role, text):
+    return encode_json({"role": role, "parts": [{"text": text}]})
+
+
+def encode_turn(turn):
+    """Serialized user+model messages for one history turn (cached by HistoryStore)."""
+    return encode_part("user", turn["user"]) + b"," + encode_part("model", turn["bot"])
+
+
+@lru_cache(maxsize=1024)
+def encode_summary(summary):
+    return encode_part("user", f"Summary of our earlier conversation:\n{summary}")
+
+
+# The system prompt never changes, so its part of the body is serialized once
+REQUEST_PREFIX = b'{"contents":[' + encode_part("user", SYSTEM_PROMPT)
+
+
+def build_body(history, user_message, summary=None):
+    """Request body for Gemini: system prompt, summary of older turns, recent turns, then the new message.
+
+    Only the new message is encoded here; everything else is joined from
+    pre-serialized bytes.
+    """
+    pieces = [REQUEST_PREFIX]
+    if summary:
+        pieces.append(encode_summary(summary))
+    for turn in history:
+        pieces.append(turn.get("json") or encode_turn(turn))
+    pieces.append(encode_part("user", user_message))
+    return b",".join(pieces) + b"]}"
+
+
+def extract_text(data):
+    return (
+        data.get("candidates", [{}])[0]
+        .get("content", {})
+        .get("parts", [{}])[0]
+        .get("text", "")
+    )
+
+
+# ========= GEMINI CALLS =========
+
+def generate(body):
+    """Blocking generateContent call with a pre-built JSON body; returns the full reply text."""
+    with client.slot():
+        response = client.post(GEMINI_URL, params={"key": GEMINI_API_KEY}, data=body)
+        response.raise_for_status()
+        return extract_text(response.json()).strip()
+
+
+def stream_generate(body):
+    """streamGenerateContent over SSE; yields text chunks as Gemini produces them."""
+    # The slot is held until the stream is fully read (or the client disconnects)
+    with client.slot(), client.post(
+        GEMINI_STREAM_URL,
+        params={"key": GEMINI_API_KEY, "alt": "sse"},
+        data=body,
+        stream=True
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith(b"data:"):
+                text = extract_text(json.loads(line[len(b"data:"):]))
+                if text:
+                    yield text
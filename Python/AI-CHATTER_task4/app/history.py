@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from .gemini import encode_turn
+from .models import ChatSummary, ChatTurn
+from . import db
+import os
+import threading
+import time
+
+
+class HistoryStore:
+    """Conversation turns per chat id: SQLite (ChatTurn) with an in-memory LRU in front.
+
+    A cached copy is used only while its newest turn id still matches the
+    newest row in the table (one indexed lookup), so turns written by other
+    worker processes are picked up. The last `max_turns` turns of a chat are
+    kept, plus any older ones not yet folded into its summary (ChatSummary),
+    so a failed fold doesn't lose them; `max_rows` caps a chat whose folds
+    keep failing. Chats are deleted once their turns are older than
+    `max_age` (login/logout start a new chat_id and anonymous sessions just
+    vanish, so nothing else would ever remove them). The purge runs every
+    `purge_interval` seconds on a background thread in each process (0 turns
+    it off; `flask --app wsgi purge-chats` runs it on demand), never inside a
+    chat request.
+    """
+
+    def __init__(self, max_turns=20, max_rows=None, cache_size=1024, max_age=timedelta(days=30),
+                 purge_interval=3600):
+        self.max_turns = max_turns
+        self.max_rows = max_rows or 4 * max_turns
+        self.cache_size = cache_size
+        self.max_age = max_age
+        self.purge_interval = purge_interval
+        self.purger = None
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()  # chat_id -> (last turn id, turns)
+
+    def get(self, chat_id):
+        if not chat_id:
+            return []
+
+        last_id = db.session.query(db.func.max(ChatTurn.id)).filter_by(chat_id=chat_id).scalar()
+        if last_id is None:
+            return []
+
+        with self.lock:
+            cached = self.cache.get(chat_id)
+            if cached and cached[0] == last_id:
+                self.cache.move_to_end(chat_id)
+                return list(cached[1])
+
+        rows = (ChatTurn.query.filter_by(chat_id=chat_id)
+                .order_by(ChatTurn.id.desc()).limit(self.max_rows).all())
+        turns = [self.make_turn(row.id, row.user, row.bot) for row in reversed(rows)]
+        self.remember(chat_id, last_id, turns)
+        return list(turns)
+
+    def append(self, chat_id, user_message, reply, history):
+        """Saves a turn; `history` is what get() returned for this request."""
+        turn = ChatTurn(chat_id=chat_id, user=user_message, bot=reply)
+        db.session.add(turn)
+        db.session.flush()
+
+        # Drop turns that fell out of the window once they're in the summary
+        through_id = db.session.query(ChatSummary.through_id).filter_by(chat_id=chat_id).scalar() or 0
+        newest = db.select(ChatTurn.id).where(ChatTurn.chat_id == chat_id).order_by(ChatTurn.id.desc())
+        (ChatTurn.query.filter(ChatTurn.chat_id == chat_id, ChatTurn.id.notin_(newest.limit(self.max_turns)),
+                               db.or_(ChatTurn.id <= through_id, ChatTurn.id.notin_(newest.limit(self.max_rows))))
+         .delete(synchronize_session=False))
+        db.session.commit()
+
+        turns = history + [self.make_turn(turn.id, user_message, reply)]
+        turns = [t for i, t in enumerate(turns) if i >= len(turns) - self.max_turns or t["id"] > through_id]
+        turns = turns[-self.max_rows:]
+        self.remember(chat_id, turn.id, turns)
+        return turns
+
+    def start_purger(self, app):
+        with self.lock:
+            if self.purger is not None or self.purge_interval <= 0:
+                return
+            self.purger = threading.Thread(target=self.purge_forever, args=(app,), daemon=True)
+        self.purger.start()
+
+    def purge_forever(self, app):
+        while True:
+            time.sleep(self.purge_interval)
+            with app.app_context():
+                try:
+                    self.purge()
+                except Exception:
+                    app.logger.exception("Chat purge failed")
+                    db.session.rollback()
+
+    def purge(self):
+        """Deletes turns older than max_age, and summaries of chats left with no turns; returns turns deleted."""
+        # `created` is the database's CURRENT_TIMESTAMP, i.e. naive UTC
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - self.max_age
+        deleted = ChatTurn.query.filter(ChatTurn.created < cutoff).delete(synchronize_session=False)
+        (ChatSummary.query.filter(ChatSummary.chat_id.notin_(db.select(ChatTurn.chat_id)))
+         .delete(synchronize_session=False))
+        db.session.commit()
+        return deleted
+
+    @staticmethod
+    def make_turn(turn_id, user_message, reply):
+        # "json" is the turn's serialized request fragment, built once per turn
+        turn = {"id": turn_id, "user": user_message, "bot": reply}
+        turn["json"] = encode_turn(turn)
+        return turn
+
+    def remember(self, chat_id, last_id, turns):
+        with self.lock:
+            self.cache[chat_id] = (last_id, turns)
+            self.cache.move_to_end(chat_id)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+
+history_store = HistoryStore(
+    max_turns=int(os.getenv("HISTORY_TURNS", 20)),
+    cache_size=int(os.getenv("HISTORY_CACHE_SIZE", 1024)),
+    max_age=timedelta(days=float(os.getenv("HISTORY_MAX_AGE_DAYS", 30))),
+    purge_interval=float(os.getenv("HISTORY_PURGE_INTERVAL", 3600))
+)
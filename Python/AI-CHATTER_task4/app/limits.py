@@ -0,0 +1,101 @@
+from collections import OrderedDict
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket per key (user id): `rate` requests/second, bursts up to `burst`.
+
+    Buckets live in this worker process only, so with N gunicorn workers a
+    user can get up to N times the rate. The least recently used buckets are
+    dropped beyond `max_keys`; a dropped bucket simply starts full again.
+    """
+
+    def __init__(self, rate=0.5, burst=10, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()  # key -> (tokens, last refill)
+
+    def acquire(self, key):
+        """Takes a token; returns 0 if allowed, else seconds until one is available."""
+        if self.rate <= 0:
+            return 0
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / self.rate
+            self.buckets[key] = (tokens - 1 if not wait else tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return wait
+
+
+class Flight:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def result(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise TimeoutError("Timed out waiting for the identical request in flight")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """Identical concurrent requests share one upstream call.
+
+    The first caller for a key becomes the leader and must call finish();
+    everyone arriving while it runs gets the same Flight and waits on it (for
+    at most `max_age` seconds). A flight older than that is assumed abandoned,
+    e.g. a stream whose client left before it started, and is replaced.
+    """
+
+    def __init__(self, max_age=120):
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    def begin(self, key):
+        """(flight, is_leader)"""
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight is not None and time.monotonic() - flight.started < self.max_age:
+                return flight, False
+            flight = self.flights[key] = Flight()
+            return flight, True
+
+    def finish(self, key, flight, value=None, error=None):
+        with self.lock:
+            if self.flights.get(key) is flight:
+                del self.flights[key]
+        flight.value, flight.error = value, error
+        flight.done.set()
+
+    def do(self, key, fn):
+        """Runs fn() once per key at a time; returns (value, was_leader)."""
+        flight, leader = self.begin(key)
+        if not leader:
+            return flight.result(self.max_age), False
+        try:
+            value = fn()
+        except Exception as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, value=value)
+        return value, True
+
+
+chat_limiter = RateLimiter(
+    rate=float(os.getenv("CHAT_RATE", 0.5)),
+    burst=float(os.getenv("CHAT_BURST", 10))
+)
+chat_flights = SingleFlight(max_age=float(os.getenv("GEMINI_READ_TIMEOUT", 60)) * 2)
@@ -1,7 +1,27 @@
 from . import db
 
 class Users(db.Model):
+    # Named unique indexes, so init-db can add them to tables created before they existed
+    __table_args__ = (
+        db.Index("ix_users_username", "username", unique=True),
+        db.Index("ix_users_email", "email", unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(150), nullable=False)
+    password = db.Column(db.String(255), nullable=False)  # scrypt hashes are ~160 chars
+
+
+class ChatTurn(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(50), unique=True, nullable=False)
-    email = db.Column(db.String(150), unique=True, nullable=False)
-    password = db.Column(db.String(150), nullable=False)
+    chat_id = db.Column(db.String(32), index=True, nullable=False)
+    user = db.Column(db.Text, nullable=False)
+    bot = db.Column(db.Text, nullable=False)
+    created = db.Column(db.DateTime, server_default=db.func.now(), index=True)  # for the age purge
+
+
+class ChatSummary(db.Model):
+    chat_id = db.Column(db.String(32), primary_key=True)
+    text = db.Column(db.Text, nullable=False)
+    through_id = db.Column(db.Integer, nullable=False)  # last ChatTurn.id folded into the summary
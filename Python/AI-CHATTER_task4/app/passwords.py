@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+import os
+import threading
+
+
+class HashingBusy(RuntimeError):
+    """Raised when the hashing pool stays full for `queue_timeout` seconds."""
+
+
+class PasswordHasher:
+    """Password hashing on a small, bounded thread pool.
+
+    hashlib's scrypt/pbkdf2 release the GIL, so hashing runs in parallel with
+    the request threads without ever using more than `workers` cores per
+    process (every gunicorn worker has its own pool); at most
+    `max_pending` hashes wait in line, so a login burst is turned away instead
+    of starving chat traffic. `method` is any werkzeug method string
+    ("scrypt:32768:8:1", "pbkdf2:sha256:600000", ...); hashes made with other
+    parameters are upgraded on the next successful login.
+    """
+
+    def __init__(self, method="scrypt", workers=1, max_pending=None, queue_timeout=5, salt_length=16):
+        self.method = method
+        self.salt_length = salt_length
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.slots = threading.BoundedSemaphore(max_pending or workers * 8)
+        self.queue_timeout = queue_timeout
+        # Full parameter prefix as stored in hashes, e.g. "scrypt" -> "scrypt:32768:8:1"
+        self.prefix = generate_password_hash("", method, salt_length=1).split("$", 1)[0]
+
+    def run(self, fn, *args):
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise HashingBusy("Too many logins in progress, please try again")
+        try:
+            future = self.pool.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split("$", 1)[0] != self.prefix
+
+    def hash(self, password):
+        return self.run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        """(ok, new_hash); new_hash is set when the stored hash used outdated parameters."""
+        return self.run(self._verify, password_hash, password)
+
+    def _verify(self, password_hash, password):
+        if not check_password_hash(password_hash, password):
+            return False, None
+        if self.needs_rehash(password_hash):
+            return True, generate_password_hash(password, self.method, self.salt_length)
+        return True, None
+
+
+def default_hash_workers():
+    # Share the cores between gunicorn's worker processes; with its default of
+    # 2xCPU+1 processes (WEB_CONCURRENCY unset) that's one hashing thread each
+    processes = int(os.getenv("WEB_CONCURRENCY", 0))
+    return max(1, (os.cpu_count() or 1) // processes) if processes else 1
+
+
+password_hasher = PasswordHasher(
+    method=os.getenv("PASSWORD_HASH_METHOD", "scrypt"),
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", 0)) or default_hash_workers(),
+    queue_timeout=float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+)
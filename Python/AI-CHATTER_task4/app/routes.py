@@ -1,31 +1,59 @@
-from dotenv import load_dotenv
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, Response, stream_with_context
 from .models import Users
+from .passwords import HashingBusy, password_hasher
+from .users import user_lookup
+from sqlalchemy.exc import IntegrityError
+from .cache import cache_key, response_cache
+from .gemini import FALLBACK_REPLY, UpstreamBusy, build_body, generate, stream_generate
+from .context import context_builder
+from .history import history_store
+from .limits import chat_flights, chat_limiter
 from . import db
-import os
+import hashlib
+import itertools
+import json
+import math
 import requests
+import uuid
 
 # ========= CONFIG =========
-load_dotenv()
-
 main = Blueprint('main', __name__)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise RuntimeError("❌ Missing GEMINI_API_KEY in environment variables")
+BUSY_RETRY_AFTER = 5  # seconds; every upstream slot was already taken for GEMINI queue_timeout
+
+
+def sse(payload, event=None):
+    """One Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+
+def turn_key(chat_id, user_message):
+    """Single-flight key for one chat turn; repeats of a message (whitespace aside) share it."""
+    digest = hashlib.sha256(" ".join(user_message.split()).encode("utf-8")).hexdigest()
+    return f"{chat_id}:{digest}"
+
+
+def rate_limited():
+    """429 response if this user is out of chat tokens, else None."""
+    # Logged-in users are limited per account, anonymous ones per client address
+    user_id = session.get("user_id")
+    wait = chat_limiter.acquire(f"user:{user_id}" if user_id else f"ip:{request.remote_addr}")
+    if not wait:
+        return None
+    response = jsonify({"reply": "⏳ You're sending messages too fast, please wait a moment."})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(math.ceil(wait))
+    return response
+
 
-GEMINI_MODEL = "gemini-2.0-flash"
-GEMINI_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
+def upstream_busy():
+    """503 response for when every Gemini slot stayed taken (UpstreamBusy)."""
+    response = jsonify({"reply": "⏳ Lots of chats right now, please try again in a few seconds."})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(BUSY_RETRY_AFTER)
+    return response
 
-SYSTEM_PROMPT = """You are AI-CHATTER — a friendly, concise AI assistant for helping people and casual conversation.
-Goals:
-- Be clear, safe, and helpful.
-- Answer directly first, then add brief extra tips if useful.
-- If the user seems uncertain, ask one short follow-up question.
-- Avoid overlong answers; prefer simple language.
-- If you don’t know something, say so.
-"""
 
 # ========= ROUTES =========
 
@@ -43,50 +71,140 @@ def chat():
     if not user_message:
         return jsonify({"reply": "⚠️ No input provided"}), 400
 
-    # Retrieve chat history
-    history = session.get("chat_history", [])
+    limited = rate_limited()
+    if limited:
+        return limited
 
-    # Build conversation for Gemini
-    contents = [{"role": "user", "parts": [{"text": SYSTEM_PROMPT}]}]
-    for turn in history:
-        contents.append({"role": "user", "parts": [{"text": turn["user"]}]})
-        contents.append({"role": "model", "parts": [{"text": turn["bot"]}]})
-    contents.append({"role": "user", "parts": [{"text": user_message}]})
+    chat_id = session.setdefault("chat_id", uuid.uuid4().hex)
 
-    try:
-        response = requests.post(
-            GEMINI_URL,
-            headers={"Content-Type": "application/json"},
-            params={"key": GEMINI_API_KEY},
-            json={"contents": contents}
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        # Extract reply safely
-        reply = (
-            data.get("candidates", [{}])[0]
-            .get("content", {})
-            .get("parts", [{}])[0]
-            .get("text", "")
-            .strip()
-        )
+    def answer():
+        # Retrieve chat history (kept server-side; the cookie only holds chat_id)
+        history = history_store.get(chat_id)
+
+        # Build conversation for Gemini: rolling summary + recent turns within the token budget
+        summary, recent = context_builder.build(chat_id, history)
+        body = build_body(recent, user_message, summary)
+        key = cache_key(recent, user_message, summary)
+
+        reply = response_cache.get(key)
+        if reply is None:
+            reply = generate(body)
+            if reply:
+                response_cache.set(key, reply)
 
         if not reply:
-            reply = "⚠️ Sorry, I couldn’t generate a response. Please try again."
+            reply = FALLBACK_REPLY
 
         # Update history
-        history.append({"user": user_message, "bot": reply})
-        session["chat_history"] = history[-20:]  # keep last 20 turns
+        turns = history_store.append(chat_id, user_message, reply, history)
+        return reply, len(turns)
 
-        return jsonify({"reply": reply, "history_len": len(session["chat_history"])})
+    try:
+        # A double submit of the same message waits for the first one instead of calling Gemini
+        # again, including any summarization the turn needs
+        (reply, history_len), _ = chat_flights.do(turn_key(chat_id, user_message), answer)
+        return jsonify({"reply": reply, "history_len": history_len})
 
+    except UpstreamBusy:
+        return upstream_busy()
     except requests.exceptions.RequestException as e:
         return jsonify({"reply": f"❌ API error: {str(e)}"}), 500
     except Exception:
         return jsonify({"reply": "⚠️ Something went wrong, please try again..."}), 500
 
 
+@main.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Chat endpoint proxying Gemini streamGenerateContent as Server-Sent Events"""
+    data = request.get_json(silent=True) or {}
+    user_message = (data.get("message") or "").strip()
+
+    if not user_message:
+        return jsonify({"reply": "⚠️ No input provided"}), 400
+
+    limited = rate_limited()
+    if limited:
+        return limited
+
+    chat_id = session.setdefault("chat_id", uuid.uuid4().hex)
+    flight_key = turn_key(chat_id, user_message)
+    flight, leader = chat_flights.begin(flight_key)
+
+    def events():
+        # Whatever happens (including the client going away), release requests waiting on this one
+        outcome = {"error": RuntimeError("The identical request was cancelled")}
+        try:
+            try:
+                # Only the leader builds the context, so a double submit folds (at most) once
+                history = history_store.get(chat_id)
+                summary, recent = context_builder.build(chat_id, history)
+                body = build_body(recent, user_message, summary)
+                key = cache_key(recent, user_message, summary)
+                cached = response_cache.get(key)
+                parts = [cached] if cached else []
+                if cached:
+                    yield sse({"text": cached})
+                else:
+                    for text in stream_generate(body):
+                        parts.append(text)
+                        yield sse({"text": text})
+            except UpstreamBusy as e:
+                outcome = {"error": e}
+                raise  # raised before the first event: answered with a 503 below
+            except requests.exceptions.RequestException as e:
+                outcome = {"error": e}
+                yield sse({"reply": f"❌ API error: {str(e)}"}, event="error")
+                return
+            except Exception as e:
+                outcome = {"error": e}
+                yield sse({"reply": "⚠️ Something went wrong, please try again..."}, event="error")
+                return
+
+            reply = "".join(parts).strip()
+            if reply and not cached:
+                response_cache.set(key, reply)
+            reply = reply or FALLBACK_REPLY
+            turns = history_store.append(chat_id, user_message, reply, history)
+            outcome = {"value": (reply, len(turns))}
+            yield sse({"reply": reply, "history_len": len(turns)}, event="done")
+        finally:
+            chat_flights.finish(flight_key, flight, **outcome)
+
+    def follow():
+        # Same message already in flight for this chat: wait for it and send its reply whole
+        try:
+            reply, history_len = flight.result(chat_flights.max_age)
+        except UpstreamBusy:
+            raise
+        except requests.exceptions.RequestException as e:
+            yield sse({"reply": f"❌ API error: {str(e)}"}, event="error")
+            return
+        except Exception:
+            yield sse({"reply": "⚠️ Something went wrong, please try again..."}, event="error")
+            return
+        yield sse({"text": reply})
+        yield sse({"reply": reply, "history_len": history_len}, event="done")
+
+    # Run up to the first event here, so a busy upstream can still get a proper 503
+    stream = events() if leader else follow()
+    try:
+        first = next(stream)
+    except UpstreamBusy:
+        return upstream_busy()
+
+    return Response(
+        stream_with_context(itertools.chain([first], stream)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@main.route('/chat/cache-stats')
+def cache_stats():
+    """Response cache hit/miss counters for this worker"""
+    return jsonify(response_cache.stats())
+
+
 # ========= AUTH ROUTES =========
 
 @main.route('/signup', methods=['GET', 'POST'])
@@ -100,18 +218,25 @@ def signup():
             flash('⚠️ All fields are required.', 'danger')
             return redirect(url_for('main.signup'))
 
-        existing_user = Users.query.filter(
-            (Users.username == username) | (Users.email == email)
-        ).first()
-
-        if existing_user:
+        if user_lookup.taken(username, email):
             flash('⚠️ Username or email already exists!', 'danger')
             return redirect(url_for('main.signup'))
 
-        hashed_password = generate_password_hash(password, method='pbkdf2:sha256', salt_length=8)
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HashingBusy:
+            flash('⚠️ Server is busy, please try again in a moment.', 'danger')
+            return redirect(url_for('main.signup'))
+
         user = Users(username=username, email=email, password=hashed_password)
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:  # registered by a concurrent request meanwhile
+            db.session.rollback()
+            flash('⚠️ Username or email already exists!', 'danger')
+            return redirect(url_for('main.signup'))
+        user_lookup.added(username)
 
         flash('✅ Account created successfully! Please log in.', 'success')
         return redirect(url_for('main.login'))
@@ -125,12 +250,21 @@ def login():
         username = (request.form.get('username') or "").strip()
         password = request.form.get('password') or ""
 
-        user = Users.query.filter_by(username=username).first()
+        user = user_lookup.find(username)
+
+        try:
+            ok, new_hash = password_hasher.verify(user.password, password) if user else (False, None)
+        except HashingBusy:
+            flash('⚠️ Server is busy, please try again in a moment.', 'danger')
+            return redirect(url_for('main.login'))
 
-        if user and check_password_hash(user.password, password):
+        if ok:
+            if new_hash:  # stored with older hash parameters; upgrade it
+                user.password = new_hash
+                db.session.commit()
             session['user_id'] = user.id
             session['username'] = user.username
-            session.pop("chat_history", None)  # reset chat
+            session.pop("chat_id", None)  # reset chat
             flash('✅ Logged in successfully!', 'success')
             return redirect(url_for('main.home'))
         else:
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from .models import Users
+from . import db
+import os
+import threading
+
+EXISTS = object()
+
+
+class UserLookup:
+    """Users lookups for signup/login with a username existence cache in front.
+
+    Positive entries never go stale, since accounts aren't deleted. A negative
+    entry records the newest Users.id at the time of the miss. It is trusted
+    only while that is still the newest id (a rowid lookup), so a signup
+    handled by another worker process shows up immediately.
+    """
+
+    def __init__(self, cache_size=100000):
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()  # username -> EXISTS | newest user id when it was missing
+
+    def newest_id(self):
+        return db.session.query(db.func.max(Users.id)).scalar() or 0
+
+    def taken(self, username, email):
+        """True if the username or the email is already registered."""
+        if self.cached(username) is EXISTS:
+            return True
+        row = (db.session.query(Users.username)
+               .filter((Users.username == username) | (Users.email == email)).first())
+        if row and row.username == username:
+            self.remember(username, EXISTS)
+        return row is not None
+
+    def find(self, username):
+        """The Users row for `username`, or None (from cache when known missing)."""
+        entry = self.cached(username)
+        if entry is EXISTS:
+            return Users.query.filter_by(username=username).first()
+        newest = self.newest_id()  # read before the lookup, so a racing signup invalidates the entry
+        if entry == newest:
+            return None
+        user = Users.query.filter_by(username=username).first()
+        self.remember(username, EXISTS if user else newest)
+        return user
+
+    def added(self, username):
+        self.remember(username, EXISTS)
+
+    def cached(self, username):
+        with self.lock:
+            entry = self.cache.get(username)
+            if entry is not None:
+                self.cache.move_to_end(username)
+            return entry
+
+    def remember(self, username, entry):
+        with self.lock:
+            self.cache[username] = entry
+            self.cache.move_to_end(username)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+
+user_lookup = UserLookup(cache_size=int(os.getenv("USER_CACHE_SIZE", 100000)))
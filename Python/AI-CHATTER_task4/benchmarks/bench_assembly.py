@@ -0,0 +1,45 @@
+# ========= Per-request body assembly: dicts + json.dumps vs cached byte fragments =========
+# No network involved; times only the work done before the POST.
+# Usage: python bench_assembly.py [turns] [iterations]
+import json
+import os
+import sys
+import timeit
+
+os.environ.setdefault("GEMINI_API_KEY", "mock-key")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from app.gemini import SYSTEM_PROMPT, build_body, encode_turn
+
+
+def build_contents(history, user_message, summary=None):
+    """The old path: rebuild every message dict, then serialize the whole body."""
+    contents = [{"role": "user", "parts": [{"text": SYSTEM_PROMPT}]}]
+    if summary:
+        contents.append({"role": "user", "parts": [{"text": f"Summary of our earlier conversation:\n{summary}"}]})
+    for turn in history:
+        contents.append({"role": "user", "parts": [{"text": turn["user"]}]})
+        contents.append({"role": "model", "parts": [{"text": turn["bot"]}]})
+    contents.append({"role": "user", "parts": [{"text": user_message}]})
+    return json.dumps({"contents": contents}).encode("utf-8")
+
+
+if __name__ == "__main__":
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 19
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    history = []
+    for i in range(turns):
+        turn = {"id": i, "user": f"Question {i}: how do I keep my plants alive in winter? " * 3,
+                "bot": f"Answer {i}: water less, keep them near light, avoid cold drafts. " * 8}
+        turn["json"] = encode_turn(turn)
+        history.append(turn)
+    summary = "The user is asking about houseplant care. " * 10
+
+    # Same request, both ways
+    assert json.loads(build_contents(history, "and cacti?", summary)) == json.loads(build_body(history, "and cacti?", summary))
+
+    print(f"🧱 {turns} history turns + summary, {iterations} requests each\n")
+    for label, fn in (("dicts + json.dumps", build_contents), ("cached fragments", build_body)):
+        seconds = timeit.timeit(lambda: fn(history, "and cacti?", summary), number=iterations)
+        print(f"{label:<20} {seconds / iterations * 1e6:8.2f} µs/request")
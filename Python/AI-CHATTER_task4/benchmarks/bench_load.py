@@ -0,0 +1,83 @@
+# ========= Load test: many concurrent chats against the mock Gemini =========
+# Compares a bare requests.post per call (the old behaviour) with the shared
+# pooled GeminiClient, then drives /chat end to end through the Flask app.
+# Usage: python bench_load.py [users] [requests_per_user]
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from mock_gemini import start_mock_gemini
+
+mock, api_base, stats = start_mock_gemini(first_token_delay=0.05, chunk_delay=0, chunks=1)
+os.environ["GEMINI_API_BASE"] = api_base
+os.environ.setdefault("GEMINI_API_KEY", "mock-key")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("CHAT_RATE", "0")  # measure throughput, not the per-user limiter
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-chat-'), 'users.db')}"
+os.environ.setdefault("GEMINI_MAX_IN_FLIGHT", "256")
+
+from app import create_app, init_db
+from app import gemini
+
+
+def bare_call(i):
+    response = requests.post(gemini.GEMINI_URL, params={"key": "mock-key"},
+                             data=gemini.build_body([], f"hi {i}"))
+    response.raise_for_status()
+
+
+def pooled_call(i):
+    gemini.generate(gemini.build_body([], f"hi {i}"))
+
+
+def run(label, users, total, call):
+    latencies = []
+
+    def one(i):
+        start = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"{label:<26} {total / elapsed:8.1f} req/s   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms")
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    total = users * per_user
+    print(f"👥 {users} concurrent users, {total} requests, mock upstream latency 50 ms\n")
+
+    run("bare requests.post", users, total, bare_call)
+    run("pooled GeminiClient", users, total, pooled_call)
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app = create_app()
+    init_db(app)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    local = threading.local()
+
+    def chat_call(i):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()  # one browser per user thread
+        local.session.post(base + "/chat", json={"message": f"hi {i}"}).raise_for_status()
+
+    run("/chat end to end", users, total, chat_call)
+    server.shutdown()
@@ -0,0 +1,88 @@
+# ========= Login throughput per core for different password hash settings =========
+# Part 1 times PasswordHasher.verify directly; part 2 drives /login end to end
+# (old pbkdf2 hashes are upgraded on the first login, then verified at the new cost).
+# Usage: python bench_login.py [users] [concurrency]
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+workdir = tempfile.mkdtemp(prefix="bench-login-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'users.db')}"
+os.environ.setdefault("GEMINI_API_KEY", "mock-key")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app import create_app, db, init_db
+from app.models import Users
+from app.passwords import PasswordHasher, password_hasher
+
+METHODS = ("pbkdf2:sha256:1000000", "pbkdf2:sha256:600000", "scrypt:32768:8:1", "scrypt:16384:8:1")
+PASSWORD = "correct horse battery staple"
+CORES = os.cpu_count() or 1
+
+
+def throughput(n, concurrency, call):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(n)))
+    return n / (time.perf_counter() - start)
+
+
+def bench_hashers(n, concurrency):
+    print(f"🔐 verify() on a {CORES}-worker pool, {n} checks, {concurrency} callers")
+    for method in METHODS:
+        hasher = PasswordHasher(method, workers=CORES)
+        stored = hasher.hash(PASSWORD)
+        rate = throughput(n, concurrency, lambda i: hasher.verify(stored, PASSWORD))
+        print(f"{method:<24} {rate:8.1f} logins/s   {rate / CORES:7.1f} per core")
+
+
+def seed(app, users):
+    # Stored the way the old signup did, so every first login rehashes
+    old_hash = generate_password_hash(PASSWORD, method="pbkdf2:sha256", salt_length=8)
+    with app.app_context():
+        db.session.add_all([Users(username=f"user{i}", email=f"user{i}@example.com", password=old_hash)
+                            for i in range(users)])
+        db.session.commit()
+
+
+def login(base, i):
+    response = requests.post(f"{base}/login", data={"username": f"user{i}", "password": PASSWORD},
+                             allow_redirects=False)
+    assert not response.headers["Location"].endswith("/login"), "login rejected"
+
+
+def bench_app(users, concurrency):
+    app = create_app()
+    init_db(app)
+    seed(app, users)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"\n🌐 /login end to end, {users} users, {concurrency} concurrent, method {password_hasher.prefix}")
+    for label in ("first login (rehash)", "second login"):
+        rate = throughput(users, concurrency, lambda i: login(base, i))
+        print(f"{label:<24} {rate:8.1f} logins/s   {rate / CORES:7.1f} per core")
+
+    with app.app_context():
+        upgraded = sum(not password_hasher.needs_rehash(user.password) for user in Users.query)
+    print(f"♻️  {upgraded}/{users} hashes upgraded to {password_hasher.prefix}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    bench_hashers(users, concurrency)
+    bench_app(users, concurrency)
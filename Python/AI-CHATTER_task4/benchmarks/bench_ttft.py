@@ -0,0 +1,64 @@
+# ========= Time-to-first-token: /chat (blocking) vs /chat/stream (SSE) =========
+# Runs the Flask app against the local mock Gemini.
+# Usage: python bench_ttft.py [rounds]
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from mock_gemini import start_mock_gemini
+
+mock, api_base, stats = start_mock_gemini(first_token_delay=0.3, chunk_delay=0.1, chunks=8)
+os.environ["GEMINI_API_BASE"] = api_base
+os.environ.setdefault("GEMINI_API_KEY", "mock-key")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("CHAT_RATE", "0")  # measure throughput, not the per-user limiter
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-chat-'), 'users.db')}"
+
+from app import create_app, init_db
+
+
+def start_app():
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app = create_app()
+    init_db(app)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def timed_post(client, url, message, stream):
+    start = time.perf_counter()
+    first = None
+    with client.post(url, json={"message": message}, stream=stream) as response:
+        for chunk in response.iter_content(chunk_size=None):
+            if chunk and first is None:
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    server, base = start_app()
+    print(f"🤖 App at {base}, mock Gemini at {api_base}\n")
+
+    for label, path, stream in (("/chat", "/chat", False), ("/chat/stream", "/chat/stream", True)):
+        client = requests.Session()
+        firsts, totals = [], []
+        for i in range(rounds):
+            first, total = timed_post(client, base + path, f"hello {i}", stream)
+            firsts.append(first)
+            totals.append(total)
+        print(f"{label:<14} first token {sum(firsts) / rounds * 1000:7.1f} ms   "
+              f"full reply {sum(totals) / rounds * 1000:7.1f} ms")
+
+    # Each streamed turn was saved server-side when its stream finished
+    history_len = client.post(base + "/chat", json={"message": "one more"}).json()["history_len"]
+    print(f"\n📝 history_len after {rounds} streamed turns + 1: {history_len}")
+    server.shutdown()
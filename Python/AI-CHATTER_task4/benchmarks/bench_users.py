@@ -0,0 +1,78 @@
+# ========= Signup/login lookups against a seeded Users table =========
+# Seeds N users (one shared password hash; hashing isn't what's measured here)
+# into a scratch SQLite DB, then times the lookups signup and login make:
+# the old unindexed-style ORM queries vs UserLookup with its existence cache.
+# Usage: python bench_users.py [users] [lookups] [db_path]
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+users = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+db_path = sys.argv[3] if len(sys.argv) > 3 else os.path.join(tempfile.mkdtemp(prefix="bench-users-"), "users.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+os.environ.setdefault("GEMINI_API_KEY", "mock-key")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db, init_db
+from app.models import Users
+from app.users import UserLookup
+
+
+def seed(path, n):
+    con = sqlite3.connect(path)
+    have = con.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    if have < n:
+        password = generate_password_hash("seeded-password")
+        with con:
+            con.executemany("INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+                            ((f"user{i}", f"user{i}@example.com", password) for i in range(have, n)))
+    con.close()
+
+
+def timed(label, names, fn):
+    samples = []
+    for name in names:
+        start = time.perf_counter()
+        fn(name)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1e6
+    p99 = samples[int(len(samples) * 0.99)] * 1e6
+    print(f"{label:<34} p50 {p50:8.1f} µs   p99 {p99:8.1f} µs")
+
+
+if __name__ == "__main__":
+    app = create_app()
+    init_db(app)
+    start = time.perf_counter()
+    seed(db_path, users)
+    print(f"🌱 {users} users in {db_path} (seeded in {time.perf_counter() - start:.1f}s)\n")
+
+    rng = random.Random(0)
+    existing = [f"user{rng.randrange(users)}" for _ in range(lookups)]
+    missing = [f"nobody{rng.randrange(users)}" for _ in range(lookups)]
+
+    with app.app_context():
+        plan = db.session.execute(db.text(
+            "EXPLAIN QUERY PLAN SELECT * FROM users WHERE username = 'x' OR email = 'x'")).fetchall()
+        print("plan:", "; ".join(row[-1] for row in plan), "\n")
+
+        timed("signup check, ORM query", missing,
+              lambda name: Users.query.filter((Users.username == name) | (Users.email == name)).first())
+        timed("login lookup, ORM query", existing, lambda name: Users.query.filter_by(username=name).first())
+
+        lookup = UserLookup()
+        timed("signup check, taken() cold", existing, lambda name: lookup.taken(name, f"{name}@example.com"))
+        timed("signup check, taken() cached", existing, lambda name: lookup.taken(name, f"{name}@example.com"))
+        timed("login, find() missing cold", missing, lookup.find)
+        timed("login, find() missing cached", missing, lookup.find)
+        timed("login, find() existing", existing, lookup.find)
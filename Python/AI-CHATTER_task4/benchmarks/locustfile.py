@@ -0,0 +1,61 @@
+# ========= Locust load test: signup, login and chat against a mocked Gemini =========
+# Needs `pip install locust` (load testing only, not an app dependency).
+#
+#   python benchmarks/mock_gemini.py 8081
+#   GEMINI_API_BASE=http://127.0.0.1:8081/v1beta flask --app wsgi init-db
+#   CHAT_RATE=0 GEMINI_API_BASE=http://127.0.0.1:8081/v1beta gunicorn -c gunicorn.conf.py wsgi:app
+#   locust -f benchmarks/locustfile.py --host http://127.0.0.1:8000 --headless -u 200 -r 20 -t 1m
+import itertools
+import os
+import uuid
+
+from locust import HttpUser, between, task
+
+PASSWORD = "load-test-password"
+ids = itertools.count()
+
+
+class ChatUser(HttpUser):
+    """Signs up and logs in once, then mostly chats (blocking and streamed)."""
+
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.username = f"load-{os.getpid()}-{next(ids)}-{uuid.uuid4().hex[:6]}"
+        self.signup()
+        self.login()
+
+    def signup(self):
+        self.client.post("/signup", name="/signup", allow_redirects=False, data={
+            "username": self.username,
+            "email": f"{self.username}@example.com",
+            "password": PASSWORD,
+        })
+
+    @task(1)
+    def login(self):
+        with self.client.post("/login", name="/login", allow_redirects=False, catch_response=True,
+                              data={"username": self.username, "password": PASSWORD}) as response:
+            # Success and failure both redirect; only a successful login goes home
+            if response.headers.get("Location", "").rstrip("/").endswith("/login"):
+                response.failure("login rejected")
+
+    @task(6)
+    def chat(self):
+        with self.client.post("/chat", json={"message": f"hello {next(ids)}"},
+                              catch_response=True) as response:
+            if response.status_code == 200 and not response.json().get("reply"):
+                response.failure("empty reply")
+
+    @task(3)
+    def chat_stream(self):
+        with self.client.post("/chat/stream", json={"message": f"stream {next(ids)}"},
+                              stream=True, catch_response=True) as response:
+            body = b"".join(response.iter_content(chunk_size=None))
+            if b"event: done" not in body:
+                response.failure("stream ended without a done event")
+
+    @task(1)
+    def signup_conflict(self):
+        # Re-registering an existing user exercises the uniqueness lookup
+        self.signup()
@@ -0,0 +1,90 @@
+# ========= Local stand-in for the Gemini REST API =========
+# Serves :generateContent (one JSON body) and :streamGenerateContent?alt=sse
+# (chunked candidates), echoing the last user message after a fixed delay.
+# Standalone: python mock_gemini.py [port], then point GEMINI_API_BASE at it.
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+def candidate(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+def make_handler(first_token_delay, chunk_delay, chunks, stats):
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with lock:
+                stats["requests"] += 1
+                stats["bytes_in"] += len(json.dumps(body))
+            message = body["contents"][-1]["parts"][0]["text"]
+            words = f"You said: {message}. " + "This is a mocked Gemini reply. " * 3
+            pieces = split(words, chunks)
+
+            time.sleep(first_token_delay)
+            if urlsplit(self.path).path.endswith(":streamGenerateContent"):
+                self.stream(pieces)
+            else:
+                time.sleep(chunk_delay * (chunks - 1))
+                payload = json.dumps(candidate("".join(pieces))).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        def stream(self, pieces):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(chunk_delay)
+                event = f"data: {json.dumps(candidate(piece))}\r\n\r\n".encode("utf-8")
+                self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # room for hundreds of concurrent clients
+
+
+def split(text, chunks):
+    size = -(-len(text) // chunks)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def start_mock_gemini(first_token_delay=0.3, chunk_delay=0.1, chunks=8, port=0):
+    """Starts the mock (on a free port unless given); returns (server, api_base, stats)."""
+    stats = {"requests": 0, "bytes_in": 0}
+    handler = make_handler(first_token_delay, chunk_delay, chunks, stats)
+    server = MockServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1beta", stats
+
+
+if __name__ == "__main__":
+    import sys
+
+    server, api_base, stats = start_mock_gemini(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8081)
+    print(f"🤖 Mock Gemini at GEMINI_API_BASE={api_base}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n{stats['requests']} requests served")
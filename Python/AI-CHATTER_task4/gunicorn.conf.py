@@ -0,0 +1,21 @@
+# ========= gunicorn settings (all overridable from the environment) =========
+# Chats spend nearly all their time waiting on Gemini, so each worker runs a
+# thread pool (gthread); workers add CPU parallelism for hashing/templating.
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 16))
+worker_class = "gthread"
+
+# Must outlive the slowest streamed reply (GEMINI_READ_TIMEOUT + retries)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")  # e.g. "-" for stdout; off by default
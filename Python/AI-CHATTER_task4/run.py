@@ -1,9 +1,8 @@
-from app import create_app, db
+# Development server only; in production use gunicorn (see gunicorn.conf.py)
+from app import create_app, init_db
 
 app = create_app()
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-        
+    init_db(app)
     app.run(debug=True)
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+from mock_gemini import start_mock_gemini
+
+mock, api_base, stats = start_mock_gemini(first_token_delay=0, chunk_delay=0, chunks=1)
+os.environ["GEMINI_API_BASE"] = api_base
+os.environ.setdefault("GEMINI_API_KEY", "mock-key")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["CHAT_RATE"] = "0"
+
+from app import context, create_app, init_db
+from app.history import history_store
+from app.models import ChatSummary, ChatTurn
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'users.db'}")
+    app = create_app()
+    init_db(app)
+    return app
+
+
+def test_short_turns_fold_every_half_window(app):
+    client = app.test_client()
+    summary_calls = []
+    for n in range(40):
+        before = stats["requests"]
+        response = client.post("/chat", json={"message": f"short message {n}"})
+        assert response.status_code == 200
+        summary_calls.append(stats["requests"] - before - 1)
+
+    # History holds 20 turns and 19 are sent verbatim: folding down to half the
+    # turns leaves room for ~10 messages before the next fold, not one.
+    folds = [n for n, calls in enumerate(summary_calls) if calls]
+    assert folds[0] == history_store.max_turns
+    assert len(folds) <= 40 // (context.context_builder.max_recent_turns // 2)
+    assert all(b - a >= context.context_builder.max_recent_turns // 2 for a, b in zip(folds, folds[1:]))
+
+
+def test_failed_fold_keeps_unsummarized_turns(app, monkeypatch):
+    def unavailable(body):
+        raise requests.exceptions.ConnectionError("summarizer down")
+
+    monkeypatch.setattr(context, "generate", unavailable)
+    client = app.test_client()
+    for n in range(30):
+        assert client.post("/chat", json={"message": f"another message {n}"}).status_code == 200
+
+    with app.app_context():
+        assert ChatSummary.query.count() == 0
+        assert ChatTurn.query.count() == 30  # nothing pruned before it was summarized
+
+    monkeypatch.undo()
+    client.post("/chat", json={"message": "summarizer is back"})
+    with app.app_context():
+        summary = ChatSummary.query.one()
+        remaining = [row.id for row in ChatTurn.query.order_by(ChatTurn.id)]
+        assert len(remaining) == history_store.max_turns
+        assert remaining[0] <= summary.through_id + 1  # no turn was dropped unsummarized
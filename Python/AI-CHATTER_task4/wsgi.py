@@ -0,0 +1,6 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+# (or the factory form: gunicorn -c gunicorn.conf.py "app:create_app()")
+# Create the tables once beforehand with: flask --app wsgi init-db
+from app import create_app
+
+app = create_app()